@@ -0,0 +1,459 @@
+# End-to-end benchmark suite: pose preprocessing and keypoint
+# post-processing, the pose model (a stub by default), physics and
+# collisions for 10 to 10,000 entities, render cost per entity type, and
+# full-loop frame times on a recorded keypoint session. Runs headless with
+# the SDL dummy drivers; no camera, model download or network needed.
+#
+# The cases run --rounds times, each round in a fresh process; a metric is
+# the median over rounds and its spread the interquartile range, so noise
+# that only shows up from one process to the next is measured too. Every
+# metric goes to a JSON file so two commits can be compared; with
+# --baseline the run exits with status 1 when a metric got worse by more
+# than --threshold (relative) and by more than the noise of both runs:
+#
+#     python benchmarks/benchmark_suite.py --output before.json
+#     git checkout my-branch
+#     python benchmarks/benchmark_suite.py --output after.json --baseline before.json --threshold 0.15
+#
+# --frames replays recorded camera frames (image directory or video) instead
+# of synthetic ones, --session a recorded .jsonl/.npz keypoint trace, and
+# --backend/--model-path time a local model instead of the stub.
+import argparse
+import ast
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+
+import cv2
+import numpy as np
+import pygame
+from capture.frame_sources import KeypointRecorder, open_frame_source
+from game_objects.blade import nearest_segments, sweep_segments
+from game_objects.entity_store import EntityStore, HALF, ITEM, ITEM_TYPES
+from game_objects.game_item import GameItem, HandKeyPoint, SlicedFruit, SplashEffect, preload_assets, build_atlas
+from movenet.backends import PoseBackend
+from movenet.motion_gate import MotionGate
+from movenet.movenet_utils import get_hand_keypoints, get_people, load_model, warm_up
+from movenet.person_tracker import PersonTracker
+from movenet.preprocessing import FramePreprocessor
+
+CASES = ["pose", "physics", "render", "loop"]
+# Units where a bigger number is better; every other metric is a time
+HIGHER_IS_BETTER = {"fps"}
+
+
+class StubPoseBackend(PoseBackend):
+    # Stands in for MoveNet: returns fixed keypoints, optionally after a
+    # simulated model latency, so the suite measures everything around it
+    name = "stub"
+    input_size = 256
+
+    def __init__(self, latency_ms=0.0, seed=0):
+        super().__init__()
+        self.latency = latency_ms / 1000
+        rng = np.random.default_rng(seed)
+        self.output = rng.uniform(0.2, 0.8, size=self.output_shape).astype(np.float32)
+        self.output[..., 2] = 0.9
+
+    def load(self):
+        return self
+
+    def infer(self, input_image):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.output
+
+
+class Results:
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, name, value, unit="ms"):
+        self.metrics[name] = {"value": round(float(value), 4), "unit": unit}
+        print(f"{name:<44} {value:>12.4f} {unit}")
+
+
+def aggregate(rounds):
+    # Median and interquartile range of every metric over the rounds
+    metrics = {}
+    for name, metric in rounds[0].items():
+        values = [round_metrics[name]["value"] for round_metrics in rounds if name in round_metrics]
+        low, median, high = np.percentile(values, [25, 50, 75])
+        metrics[name] = {"value": round(float(median), 4), "unit": metric["unit"], "spread": round(float(high - low), 4)}
+        print(f"{name:<44} {median:>12.4f} {metric['unit']:<3} +/- {high - low:.4f}")
+    return metrics
+
+
+def median_ms(function, repeat, warmup=3):
+    for _ in range(warmup):
+        function()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.median(samples))
+
+
+def load_frames(spec, count, width=640, height=480):
+    # Recorded frames when a source is given, otherwise a seeded synthetic
+    # sequence: noise plus a bright block moving across it
+    if spec:
+        source = open_frame_source(spec)
+        frames = []
+        while len(frames) < count:
+            ret, frame = source.read()
+            if not ret:
+                break
+            frames.append(frame.copy())
+        source.release()
+        if frames:
+            return frames
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        left = (i * 16) % (width - 120)
+        frame[180:300, left:left + 120] = 255
+        frames.append(frame)
+    return frames
+
+
+def multipose_output(rng, people=2):
+    output = np.zeros((1, 6, 56), dtype=np.float32)
+    for person in range(people):
+        output[0, person, :51] = rng.uniform(0.1, 0.9, 51)
+        output[0, person, 2:51:3] = 0.8
+        output[0, person, 51:55] = (0.1, 0.1 + 0.4 * person, 0.9, 0.5 + 0.4 * person)
+        output[0, person, 55] = 0.9
+    return output
+
+
+def bench_pose(results, args):
+    frames = load_frames(args.frames, 60)
+    if args.backend:
+        model = load_model(args.backend, args.model_path, args.num_threads)
+        warm_up(model)
+    else:
+        model = StubPoseBackend(args.stub_latency_ms)
+    preprocessor = FramePreprocessor(model.input_size, model.input_dtype)
+    frame_cycle = itertools.cycle(frames)
+
+    results.add("pose.preprocess_ms", median_ms(lambda: preprocessor.preprocess(next(frame_cycle)), args.repeat * 10))
+    gate = MotionGate()
+    results.add("pose.motion_gate_ms", median_ms(lambda: gate.should_infer(next(frame_cycle)), args.repeat * 10))
+    input_image = preprocessor.preprocess(frames[0])
+    results.add(f"pose.inference_{model.name}_ms", median_ms(lambda: preprocessor.run_inference(model, input_image), args.repeat * 5))
+
+    # Keypoint post-processing, single-pose and MultiPose
+    single = model(input_image)
+    results.add("pose.postprocess_single_ms", median_ms(lambda: get_hand_keypoints(preprocessor.to_frame(single)), args.repeat * 10))
+    rng = np.random.default_rng(1)
+    multipose = multipose_output(rng)
+    tracker = PersonTracker()
+
+    def postprocess_multipose():
+        for track in tracker.update(get_people(preprocessor.to_frame(multipose))):
+            get_hand_keypoints(track.keypoints.reshape(1, 1, 17, 3))
+
+    results.add("pose.postprocess_multipose_ms", median_ms(postprocess_multipose, args.repeat * 10))
+
+
+def moving_hands(width, height):
+    hands = [HandKeyPoint(width // 3, height // 2), HandKeyPoint(2 * width // 3, height // 2)]
+    step = itertools.count()
+
+    def move():
+        # Both wrists sweep circles, so every step has real blade segments
+        angle = next(step) * 0.3
+        for i, hand in enumerate(hands):
+            hand.update_position(width * (0.3 + 0.4 * i) + 150 * math.cos(angle), height * 0.5 + 150 * math.sin(angle))
+        return sweep_segments(hands)
+
+    return move
+
+
+def bench_physics(results, args, screen):
+    width, height = screen.get_size()
+    item_types = list(GameItem.item_images)
+    for count in args.counts:
+        random.seed(0)
+        move = moving_hands(width, height)
+
+        # Per-object path: GameItem.update_position and one batched collision query
+        items = []
+        for _ in range(count):
+            game_item = GameItem(screen, width, height, random.choice(item_types))
+            game_item.rect.y = random.randint(0, height)
+            items.append(game_item)
+
+        def object_step():
+            blade_starts, blade_ends, _ = move()
+            for game_item in items:
+                game_item.update_position()
+            nearest_segments([game_item.center() for game_item in items], blade_starts, blade_ends)
+
+        results.add(f"physics.objects.{count}_ms", median_ms(object_step, args.steps))
+
+        # Structure-of-arrays path
+        store = EntityStore(screen, width, height)
+        for i in range(count):
+            store.spawn_item(random.choice(item_types))
+        store.y[:count] = np.random.default_rng(0).uniform(0, height, count)
+
+        def vectorized_step():
+            blade_starts, blade_ends, _ = move()
+            store.update_positions()
+            store.check_collisions(blade_starts, blade_ends)
+
+        results.add(f"physics.vectorized.{count}_ms", median_ms(vectorized_step, args.steps))
+
+
+def bench_render(results, args, screen, background):
+    # Cost of drawing one entity of each type, in microseconds, measured over
+    # args.render_count entities of that type per frame
+    width, height = screen.get_size()
+    count = args.render_count
+    random.seed(0)
+    fruit_types = [item_type for item_type in GameItem.item_images if item_type != "bomb"]
+
+    def positions():
+        return random.randint(0, width - 100), random.randint(0, height - 100)
+
+    items = []
+    for _ in range(count):
+        game_item = GameItem(screen, width, height, random.choice(list(GameItem.item_images)))
+        game_item.x, game_item.y = positions()
+        game_item.prev_x, game_item.prev_y = game_item.x, game_item.y
+        items.append(game_item)
+    halves = []
+    for _ in range(count):
+        half_1_path, half_2_path = GameItem.half_images[random.choice(fruit_types)]
+        halves.append(SlicedFruit(screen, *positions(), half_1_path, half_2_path, GameItem.scale_factor))
+    splashes = []
+    for _ in range(count):
+        splash_effect = SplashEffect(screen, *positions(), GameItem.splash_images[random.choice(fruit_types)], GameItem.scale_factor)
+        splash_effect.duration = float("inf")
+        splashes.append(splash_effect)
+    blades = [HandKeyPoint(*positions()) for _ in range(count)]
+
+    store = EntityStore(screen, width, height)
+    for _ in range(count):
+        store.spawn_item(random.choice(list(GameItem.item_images)))
+        store.spawn_halves(ITEM_TYPES.index(random.choice(fruit_types)), *positions())
+    store.x[:store.count] = np.random.default_rng(0).uniform(0, width - 100, store.count)
+    store.y[:store.count] = np.random.default_rng(1).uniform(0, height - 100, store.count)
+    store.prev_x[:store.count], store.prev_y[:store.count] = store.x[:store.count], store.y[:store.count]
+
+    cases = {
+        "item": lambda: [game_item.render(0.5) for game_item in items],
+        "half": lambda: [sliced_fruit.render(0.5) for sliced_fruit in halves],
+        "splash": lambda: [splash_effect.render() for splash_effect in splashes],
+        "blade": lambda: [blade.draw(screen) for blade in blades],
+        "vectorized_item": lambda: store.render(ITEM, 0.5),
+        "vectorized_half": lambda: store.render(HALF, 0.5),
+    }
+    for name, render in cases.items():
+        per_entity = count * (2 if name == "vectorized_half" else 1)
+        results.add(f"render.{name}_us", median_ms(render, args.repeat) * 1000 / per_entity, "us")
+    results.add("render.background_ms", median_ms(lambda: screen.blit(background, (0, 0)), args.repeat))
+    results.add("render.flip_ms", median_ms(pygame.display.flip, args.repeat))
+
+
+def synthetic_session(path, frames):
+    # Wrists sweeping circles in front of a still body, as a keypoint trace
+    recorder = KeypointRecorder(path, (640, 480))
+    rng = np.random.default_rng(0)
+    body = np.zeros((17, 3), dtype=np.float32)
+    body[:, 0] = rng.uniform(0.3, 0.8, 17)
+    body[:, 1] = rng.uniform(0.35, 0.65, 17)
+    body[:, 2] = 0.9
+    for i in range(frames):
+        keypoints = body.copy()
+        angle = i * 0.15
+        keypoints[9, :2] = (0.5 + 0.25 * math.sin(angle), 0.3 + 0.2 * math.cos(angle))
+        keypoints[10, :2] = (0.5 + 0.25 * math.cos(angle), 0.7 + 0.2 * math.sin(angle))
+        recorder.record(keypoints.reshape(1, 1, 17, 3))
+    recorder.save()
+
+
+def bench_loop(results, args):
+    # Runs the real main.py against a keypoint trace, with its frame limiter
+    # off, and reads its frame profile. work_p50_ms is the sum of every
+    # stage's median.
+    with tempfile.TemporaryDirectory() as directory:
+        session = args.session
+        if session is None:
+            session = os.path.join(directory, "session.npz")
+            synthetic_session(session, 300)
+        for variant, extra in (("objects", []), ("vectorized", ["--vectorized"])):
+            command = [
+                sys.executable, "src/main.py", "--source", session, "--loop", "--headless", "--skip-tutorial", "--max-fps", "0",
+                "--seed", "1", "--max-frames", str(args.loop_frames), "--spawn-count", str(args.loop_spawn_count),
+                "--leaderboard", os.path.join(directory, "leaderboard.db"),
+            ] + extra
+            output = subprocess.run(command, capture_output=True, text=True, timeout=600).stdout
+            profile = None
+            for line in output.splitlines():
+                if line.startswith("Frame profile: "):
+                    profile = ast.literal_eval(line[len("Frame profile: "):])
+            if profile is None:
+                print(f"loop.{variant}: main.py produced no frame profile")
+                continue
+            results.add(f"loop.{variant}.fps", profile["fps"], "fps")
+            results.add(f"loop.{variant}.frame_p50_ms", profile["frame"]["p50"])
+            work = sum(stage["p50"] for name, stage in profile.items() if name not in ("fps", "frame", "idle"))
+            results.add(f"loop.{variant}.work_p50_ms", work)
+
+
+def compare(metrics, baseline, threshold, noise_floor_ms, spread_factor):
+    # Relative change of every metric against the baseline; returns the
+    # names of those that got worse by more than threshold and by more than
+    # the noise: spread_factor times the larger spread of the two runs, and
+    # for times at least noise_floor_ms.
+    regressions = []
+    print(f"\n{'metric':<44} {'baseline':>12} {'current':>12} {'change':>8} {'noise':>10}")
+    for name, metric in metrics.items():
+        old = baseline.get(name)
+        if old is None or old["value"] <= 0:
+            continue
+        change = metric["value"] / old["value"] - 1
+        worse = old["value"] - metric["value"] if metric["unit"] in HIGHER_IS_BETTER else metric["value"] - old["value"]
+        noise = spread_factor * max(metric.get("spread", 0.0), old.get("spread", 0.0))
+        if metric["unit"] not in HIGHER_IS_BETTER:
+            noise = max(noise, noise_floor_ms * (1000 if metric["unit"] == "us" else 1))
+        status = ""
+        if worse > threshold * old["value"] and worse > noise:
+            regressions.append(name)
+            status = "  REGRESSED"
+        print(f"{name:<44} {old['value']:>12.4f} {metric['value']:>12.4f} {change:>+7.1%} {noise:>10.4f}{status}")
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SliceFrenzy end-to-end benchmark suite")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file the metrics are written to")
+    parser.add_argument("--baseline", default=None, help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative slowdown that counts as a regression")
+    parser.add_argument("--noise-floor-ms", type=float, default=0.05, help="slowdowns this small never count as regressions")
+    parser.add_argument("--spread-factor", type=float, default=2.0, help="a regression must exceed this many interquartile ranges of either run")
+    parser.add_argument("--rounds", type=int, default=5, help="times the cases are run, each in a fresh process")
+    parser.add_argument("--round-output", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--repeat", type=int, default=50, help="timed repetitions per case (some cases run a multiple)")
+    parser.add_argument("--steps", type=int, default=30, help="simulation steps timed per physics entity count")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000, 10000], help="entity counts for the physics case")
+    parser.add_argument("--render-count", type=int, default=200, help="entities of each type drawn per render frame")
+    parser.add_argument("--frames", default=None, help="image directory or video of recorded camera frames for the pose case")
+    parser.add_argument("--session", default=None, help="recorded .jsonl/.npz keypoint trace for the full-loop case")
+    parser.add_argument("--loop-frames", type=int, default=600)
+    parser.add_argument("--loop-spawn-count", type=int, default=3)
+    parser.add_argument("--backend", default=None, help="time a local pose model instead of the stub")
+    parser.add_argument("--model-path", default=None)
+    parser.add_argument("--num-threads", type=int, default=None)
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="simulated inference time of the stub model")
+    parser.add_argument("--width", type=int, default=960)
+    parser.add_argument("--height", type=int, default=720)
+    args = parser.parse_args()
+    # Paths are relative to the caller's directory; main.py and the assets
+    # are found relative to the repository root
+    caller_directory = os.getcwd()
+    for name in ("output", "baseline", "frames", "session", "model_path", "round_output"):
+        path = getattr(args, name)
+        if path and not (name == "frames" and path.isdigit()):
+            setattr(args, name, os.path.abspath(path))
+    os.chdir(REPO_ROOT)
+    if args.round_output:
+        run_round(args)
+        return
+
+    rounds = []
+    with tempfile.TemporaryDirectory() as directory:
+        round_output = os.path.join(directory, "round.json")
+        for number in range(1, args.rounds + 1):
+            print(f"Round {number}/{args.rounds}")
+            command = [sys.executable, os.path.abspath(__file__)] + sys.argv[1:] + ["--round-output", round_output]
+            process = subprocess.run(command, capture_output=True, text=True, cwd=caller_directory)
+            if process.returncode != 0:
+                print(process.stdout + process.stderr)
+                sys.exit(f"Round {number} failed")
+            with open(round_output, "r") as file:
+                rounds.append(json.load(file))
+    metrics = aggregate(rounds)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "pygame": pygame.version.ver,
+            "args": vars(args),
+        },
+        "metrics": metrics,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nWrote {len(metrics)} metrics to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)["metrics"]
+        regressions = compare(metrics, baseline, args.threshold, args.noise_floor_ms, args.spread_factor)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+def run_round(args):
+    # One round of every selected case, in this process
+    random.seed(0)
+    cv2.setRNGSeed(0)
+    results = Results()
+    if "pose" in args.cases:
+        bench_pose(results, args)
+    if "physics" in args.cases or "render" in args.cases:
+        pygame.init()
+        screen = pygame.display.set_mode((args.width, args.height))
+        preload_assets()
+        build_atlas()
+        background = pygame.Surface((args.width, args.height))
+        background.fill((40, 30, 20))
+        if "physics" in args.cases:
+            bench_physics(results, args, screen)
+        if "render" in args.cases:
+            bench_render(results, args, screen, background)
+        pygame.quit()
+    if "loop" in args.cases:
+        bench_loop(results, args)
+
+    with open(args.round_output, "w") as file:
+        json.dump(results.metrics, file)
+
+
+if __name__ == "__main__":
+    main()
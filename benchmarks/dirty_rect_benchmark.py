@@ -0,0 +1,97 @@
+# Compares full-screen redraw + display.flip with dirty-rectangle rendering.
+#
+# Replays the same seeded scene (items flying, halves falling, two swords and
+# the score text) in both modes and reports milliseconds and pixels
+# pushed per frame. Also checks that both modes produce identical frames.
+#
+#     python benchmarks/dirty_rect_benchmark.py --frames 300 --counts 5 20 80
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+os.chdir(REPO_ROOT)
+
+import pygame
+from game_objects.game_item import GameItem, HandKeyPoint, SlicedFruit, preload_assets, build_atlas
+from game_objects.dirty_rects import DirtyRectRenderer, dirty_rects
+
+
+def run(screen, background, font, count, frames, dirty):
+    random.seed(0)
+    width, height = screen.get_size()
+    renderer = DirtyRectRenderer(screen, background) if dirty else None
+    dirty_rects.enabled = dirty
+    items = [GameItem(screen, width, height, random.choice(list(GameItem.item_images))) for _ in range(count)]
+    halves = []
+    hands = [HandKeyPoint(width // 3, height // 2), HandKeyPoint(2 * width // 3, height // 2)]
+    screen_pixels = width * height
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        if renderer is not None:
+            renderer.begin_frame()
+        else:
+            screen.blit(background, (0, 0))
+
+        for i, game_item in enumerate(items):
+            game_item.update_position()
+            if game_item.out_of_bounds():
+                # Relaunch the item and drop a pair of halves from the top
+                game_item = items[i] = GameItem(screen, width, height, game_item.item_type)
+                if game_item.item_type != "bomb":
+                    half_1_path, half_2_path = GameItem.half_images[game_item.item_type]
+                    halves.append(SlicedFruit(screen, random.randint(0, width), 0, half_1_path, half_2_path, 1))
+            game_item.render()
+        for sliced_fruit in halves:
+            sliced_fruit.update_position(height)
+            sliced_fruit.render()
+        halves = [sliced_fruit for sliced_fruit in halves if not sliced_fruit.out_of_bounds(height)]
+
+        for i, hand in enumerate(hands):
+            hand.update_position(width // 2 + (i * 2 - 1) * 200 * (frame % 60) / 60, height // 2)
+            hand.draw(screen)
+        dirty_rects.add(screen.blit(font.render(f"Score: {frame // 10}", 1, (0, 0, 0)), (10, 10)))
+
+        if renderer is not None:
+            renderer.end_frame()
+        else:
+            pygame.display.flip()
+
+    elapsed_ms = (time.perf_counter() - start) / frames * 1000
+    pixels = renderer.pixels_pushed / frames if renderer is not None else screen_pixels
+    return elapsed_ms, pixels, pygame.image.tobytes(screen, "RGB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full flip vs dirty-rect rendering")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--counts", type=int, nargs="+", default=[5, 20, 80])
+    parser.add_argument("--width", type=int, default=960)
+    parser.add_argument("--height", type=int, default=720)
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((args.width, args.height))
+    background = pygame.transform.scale(pygame.image.load("assets/images/background.png"), (args.width, args.height)).convert()
+    font = pygame.font.Font("assets/fonts/custom_font.ttf", 36)
+    preload_assets()
+    build_atlas()
+
+    print(f"{'items':>6} {'full ms':>8} {'dirty ms':>9} {'full px/frame':>14} {'dirty px/frame':>15} {'same frame':>11}")
+    for count in args.counts:
+        full_ms, full_pixels, full_frame = run(screen, background, font, count, args.frames, dirty=False)
+        dirty_ms, dirty_pixels, dirty_frame = run(screen, background, font, count, args.frames, dirty=True)
+        print(f"{count:>6} {full_ms:>8.3f} {dirty_ms:>9.3f} {full_pixels:>14.0f} {dirty_pixels:>15.0f} {str(full_frame == dirty_frame):>11}")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
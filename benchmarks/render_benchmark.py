@@ -0,0 +1,115 @@
+# Micro-benchmark for per-frame render cost of live game objects.
+#
+# Compares the old render path (pygame.transform.scale on every frame) with the
+# pre-scaled sprite atlas. Runs headless with the SDL dummy drivers:
+#
+#     python benchmarks/render_benchmark.py --frames 200 --counts 10 100 1000
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+os.chdir(REPO_ROOT)
+
+import pygame
+from game_objects.game_item import GameItem, HandKeyPoint, SlicedFruit, SplashEffect, preload_assets, build_atlas
+from game_objects.assets import assets
+
+
+def legacy_scale(image, scale_factor):
+    return pygame.transform.scale(image, (int(image.get_width() * scale_factor), int(image.get_height() * scale_factor)))
+
+
+def legacy_render(objects, screen, sword_image):
+    # Reproduces the render paths before the atlas: one scale per image per frame
+    for game_item in objects["items"]:
+        screen.blit(legacy_scale(game_item.main_image, game_item.scale_factor), (game_item.x, game_item.y))
+    for sliced_fruit in objects["sliced"]:
+        screen.blit(legacy_scale(sliced_fruit.half_1_sprite.image(), sliced_fruit.scale_factor), (sliced_fruit.x1, sliced_fruit.y1))
+        screen.blit(legacy_scale(sliced_fruit.half_2_sprite.image(), sliced_fruit.scale_factor), (sliced_fruit.x2, sliced_fruit.y2))
+    for splash_effect, splash_image in zip(objects["splashes"], objects["splash_images"]):
+        scaled = legacy_scale(splash_image, splash_effect.scale_factor)
+        splash_copy = scaled.copy()
+        splash_copy.fill((255, 255, 255, 128), special_flags=pygame.BLEND_RGBA_MULT)
+        screen.blit(splash_copy, (splash_effect.x, splash_effect.y))
+    for hand in objects["hands"]:
+        scaled = legacy_scale(sword_image, hand.scale_factor)
+        screen.blit(scaled, (int(hand.x - scaled.get_width() // 2), int(hand.y - scaled.get_height() // 2)))
+
+
+def atlas_render(objects, screen, sword_image):
+    for game_item in objects["items"]:
+        game_item.render()
+    for sliced_fruit in objects["sliced"]:
+        sliced_fruit.render()
+    for splash_effect in objects["splashes"]:
+        splash_effect.render()
+    for hand in objects["hands"]:
+        hand.draw(screen)
+
+
+def make_objects(screen, width, height, count):
+    # Split the live objects evenly between whole items, halves and splashes
+    items, sliced, splashes, splash_images = [], [], [], []
+    fruit_types = [item_type for item_type in GameItem.item_images if item_type != "bomb"]
+    for i in range(count):
+        game_item = GameItem(screen, width, height, random.choice(list(GameItem.item_images)))
+        game_item.x, game_item.y = random.randint(0, width), random.randint(0, height)
+        kind = i % 3
+        if kind == 0:
+            items.append(game_item)
+        else:
+            fruit_type = random.choice(fruit_types)
+            x, y = random.randint(0, width), random.randint(0, height)
+            if kind == 1:
+                half_1_path, half_2_path = GameItem.half_images[fruit_type]
+                sliced.append(SlicedFruit(screen, x, y, half_1_path, half_2_path, GameItem.scale_factor))
+            else:
+                splash_effect = SplashEffect(screen, x, y, GameItem.splash_images[fruit_type], GameItem.scale_factor)
+                splash_effect.duration = float("inf")
+                splashes.append(splash_effect)
+                splash_images.append(assets.image(GameItem.splash_images[fruit_type]))
+    hands = [HandKeyPoint(width // 3, height // 2), HandKeyPoint(2 * width // 3, height // 2)]
+    return {"items": items, "sliced": sliced, "splashes": splashes, "splash_images": splash_images, "hands": hands}
+
+
+def time_frames(render, objects, screen, sword_image, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        render(objects, screen, sword_image)
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame render cost before and after the sprite atlas")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--width", type=int, default=960)
+    parser.add_argument("--height", type=int, default=720)
+    args = parser.parse_args()
+
+    random.seed(0)
+    pygame.init()
+    screen = pygame.display.set_mode((args.width, args.height))
+    preload_assets()
+    build_atlas()
+    sword_image = assets.image(HandKeyPoint.sword_image_path)
+
+    print(f"{'objects':>8} {'legacy ms/frame':>16} {'atlas ms/frame':>15} {'speedup':>8}")
+    for count in args.counts:
+        objects = make_objects(screen, args.width, args.height, count)
+        legacy_ms = time_frames(legacy_render, objects, screen, sword_image, args.frames)
+        atlas_ms = time_frames(atlas_render, objects, screen, sword_image, args.frames)
+        print(f"{count:>8} {legacy_ms:>16.3f} {atlas_ms:>15.3f} {legacy_ms / atlas_ms:>7.2f}x")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import glob
+import json
+import os
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+TRACE_EXTENSIONS = (".jsonl", ".npz")
+# Frame rate of recorded sources that do not store one
+DEFAULT_FPS = 30
+
+
+class FrameSource:
+    # Where the game gets its frames from. read() follows cv2.VideoCapture
+    # (returns (ret, frame)) so sources can be handed to the pose pipeline.
+    # Sources with keypoints_only set provide read_keypoints() instead and the
+    # pose model is not needed at all; sources with runs_inference set run
+    # the model themselves and provide latest() like the pose pipeline.
+    keypoints_only = False
+    runs_inference = False
+    # Set by sources that run in another process when that process fails
+    error = None
+    # Frames per second a recorded source is meant to be played at; None for
+    # cameras, which deliver frames at their own pace
+    fps = None
+
+    def __init__(self):
+        self.width = 640
+        self.height = 480
+
+    def read(self):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+
+class CameraSource(FrameSource):
+    def __init__(self, index=0):
+        super().__init__()
+        self.capture = cv2.VideoCapture(index)
+        self.width = int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def read(self):
+        return self.capture.read()
+
+    def release(self):
+        self.capture.release()
+
+
+class VideoFileSource(CameraSource):
+    # Recorded MP4 (or anything else OpenCV can decode), optionally looped
+    def __init__(self, path, loop=False):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Video not found at {path}")
+        super().__init__(path)
+        self.loop = loop
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+
+    def read(self):
+        ret, frame = self.capture.read()
+        if not ret and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read()
+        return ret, frame
+
+
+class ImageSequenceSource(FrameSource):
+    # A directory of numbered frames, or a glob pattern such as frames/*.png
+    def __init__(self, pattern, loop=False):
+        super().__init__()
+        if os.path.isdir(pattern):
+            paths = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            paths = glob.glob(pattern)
+        self.paths = sorted(path for path in paths if path.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.paths:
+            raise FileNotFoundError(f"No images found for {pattern}")
+        self.loop = loop
+        self.fps = DEFAULT_FPS
+        self.index = 0
+        first_frame = cv2.imread(self.paths[0])
+        self.height, self.width = first_frame.shape[:2]
+
+    def read(self):
+        if self.index >= len(self.paths):
+            if not self.loop:
+                return False, None
+            self.index = 0
+        frame = cv2.imread(self.paths[self.index])
+        self.index += 1
+        return frame is not None, frame
+
+
+class KeypointTraceSource(FrameSource):
+    # Replays keypoints_with_scores recorded by KeypointRecorder, skipping the
+    # camera and inference entirely
+    keypoints_only = True
+    fps = DEFAULT_FPS
+
+    def __init__(self, path, loop=False):
+        super().__init__()
+        self.loop = loop
+        self.index = 0
+        if path.endswith(".npz"):
+            with np.load(path) as trace:
+                self.keypoints = self.frames_array(trace["keypoints"])
+                if "frame_size" in trace:
+                    self.width, self.height = (int(value) for value in trace["frame_size"])
+        else:
+            keypoints = []
+            with open(path, "r") as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if "frame_size" in record:
+                        # Header line written by KeypointRecorder
+                        self.width, self.height = record["frame_size"]
+                        continue
+                    keypoints.append(record["keypoints"])
+            self.keypoints = self.frames_array(keypoints)
+        if len(self.keypoints) == 0:
+            raise ValueError(f"Keypoint trace {path} is empty")
+
+    def frames_array(self, keypoints):
+        # One model output per frame: [1, 1, 17, 3] single-pose or [1, 6, 56] MultiPose
+        keypoints = np.asarray(keypoints, dtype=np.float32)
+        if keypoints.shape[-1] == 56:
+            return keypoints.reshape(-1, 1, keypoints.shape[-2], 56)
+        return keypoints.reshape(-1, 1, 1, 17, 3)
+
+    def read_keypoints(self):
+        if self.index >= len(self.keypoints):
+            if not self.loop:
+                return None
+            self.index = 0
+        keypoints_with_scores = self.keypoints[self.index]
+        self.index += 1
+        return keypoints_with_scores
+
+    def read(self):
+        # Blank frames, for callers that only need the frame rate of the trace
+        if self.read_keypoints() is None:
+            return False, None
+        return True, np.zeros((self.height, self.width, 3), dtype=np.uint8)
+
+
+class KeypointRecorder:
+    # Records the keypoints_with_scores of every inference so a session can be
+    # replayed later with KeypointTraceSource (.jsonl or .npz)
+    def __init__(self, path, frame_size):
+        self.path = path
+        self.frame_size = frame_size
+        self.keypoints = []
+
+    def record(self, keypoints_with_scores):
+        self.keypoints.append(np.array(keypoints_with_scores, dtype=np.float32))
+
+    def save(self):
+        if self.path.endswith(".npz"):
+            np.savez_compressed(self.path, keypoints=np.array(self.keypoints, dtype=np.float32), frame_size=np.array(self.frame_size))
+            return
+        with open(self.path, "w") as file:
+            file.write(json.dumps({"frame_size": list(self.frame_size)}) + "\n")
+            for keypoints in self.keypoints:
+                file.write(json.dumps({"keypoints": keypoints.round(5).tolist()}) + "\n")
+
+
+def open_frame_source(spec, loop=False):
+    # "0", "1", ... open a camera; .jsonl/.npz are keypoint traces; a
+    # directory or glob is an image sequence; anything else is a video file
+    if spec.isdigit():
+        return CameraSource(int(spec))
+    if spec.endswith(TRACE_EXTENSIONS):
+        return KeypointTraceSource(spec, loop)
+    if os.path.isdir(spec) or glob.has_magic(spec):
+        return ImageSequenceSource(spec, loop)
+    return VideoFileSource(spec, loop)
@@ -0,0 +1,299 @@
+import multiprocessing
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from capture.frame_sources import FrameSource, open_frame_source
+
+# Keypoint slots are sized for the largest model output ([1, 6, 56] MultiPose)
+MAX_KEYPOINT_VALUES = 6 * 56
+
+# control[] fields
+LATEST_SEQUENCE = 0
+FINISHED = 1
+KEYPOINT_SHAPE = 2  # 4 entries, zero-padded
+
+# stage_ms[] fields: (last, average) for capture and inference
+CAPTURE_MS = 0
+INFERENCE_MS = 2
+
+
+class SharedFrameRing:
+    # A ring of frame + keypoint slots in one multiprocessing.shared_memory
+    # block. The writer fills slot (sequence % slots) and then publishes the
+    # sequence number; a slot being rewritten is marked -1 first, so a reader
+    # never picks up a half-written slot as the latest one. Readers copy a
+    # slot out of the block and check its sequence number again afterwards,
+    # since the writer reuses it once it laps the ring; nothing is pickled.
+    def __init__(self, frame_shape, slots=4, name=None):
+        self.frame_shape = tuple(frame_shape)
+        self.slots = slots
+        layout = [
+            ("control", np.int64, (8,)),
+            ("slot_sequence", np.int64, (slots,)),
+            ("slot_time", np.float64, (slots,)),
+            ("stage_ms", np.float64, (4,)),
+            ("keypoints", np.float32, (slots, MAX_KEYPOINT_VALUES)),
+            ("frames", np.uint8, (slots,) + self.frame_shape),
+        ]
+        size = sum(np.dtype(dtype).itemsize * int(np.prod(shape)) for _, dtype, shape in layout)
+        self.created = name is None
+        if self.created or sys.version_info < (3, 13):
+            # Only the creating process registers and unlinks the block. The
+            # forked child shares its resource tracker (CaptureProcess starts
+            # it before forking), where attaching again is a no-op.
+            self.memory = shared_memory.SharedMemory(name=name, create=self.created, size=size if self.created else 0)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name, track=False)
+        self.name = self.memory.name
+        offset = 0
+        for field, dtype, shape in layout:
+            array = np.ndarray(shape, dtype=dtype, buffer=self.memory.buf, offset=offset)
+            setattr(self, field, array)
+            offset += array.nbytes
+        if self.created:
+            self.control[:] = 0
+            self.slot_sequence[:] = -1
+            self.stage_ms[:] = 0
+
+    def write(self, frame, keypoints_with_scores=None, timestamp=None):
+        sequence = int(self.control[LATEST_SEQUENCE]) + 1
+        slot = sequence % self.slots
+        self.slot_sequence[slot] = -1
+        np.copyto(self.frames[slot], frame)
+        if keypoints_with_scores is not None:
+            keypoints_with_scores = np.asarray(keypoints_with_scores, dtype=np.float32)
+            self.keypoints[slot, :keypoints_with_scores.size] = keypoints_with_scores.ravel()
+        self.slot_time[slot] = time.perf_counter() if timestamp is None else timestamp
+        self.slot_sequence[slot] = sequence
+        self.control[LATEST_SEQUENCE] = sequence
+        return sequence
+
+    def set_keypoint_shape(self, shape):
+        self.control[KEYPOINT_SHAPE:KEYPOINT_SHAPE + 4] = 0
+        self.control[KEYPOINT_SHAPE:KEYPOINT_SHAPE + len(shape)] = shape
+
+    def keypoint_shape(self):
+        return tuple(int(dim) for dim in self.control[KEYPOINT_SHAPE:KEYPOINT_SHAPE + 4] if dim)
+
+    def latest(self):
+        # (sequence, slot) of the newest complete slot, or None
+        sequence = int(self.control[LATEST_SEQUENCE])
+        if sequence == 0:
+            return None
+        slot = sequence % self.slots
+        if self.slot_sequence[slot] != sequence:
+            return None
+        return sequence, slot
+
+    def record_stage(self, field, milliseconds):
+        self.stage_ms[field] = milliseconds
+        self.stage_ms[field + 1] += 0.1 * (milliseconds - self.stage_ms[field + 1])
+
+    def close(self):
+        # Drop the numpy views first, the buffer cannot close while they exist
+        for field in ("control", "slot_sequence", "slot_time", "stage_ms", "keypoints", "frames"):
+            setattr(self, field, None)
+        try:
+            self.memory.close()
+        except BufferError:
+            # A caller still holds a frame view; the mapping goes away with the process
+            pass
+
+    def unlink(self):
+        if self.created:
+            self.memory.unlink()
+
+
+def capture_worker(spec, loop, slots, infer, backend, model_path, num_threads, connection):
+    # Child process: open the source, report the frame size, attach to the
+    # ring the parent created and keep writing frames (and keypoints) into it.
+    # Recorded sources are paced to their frame rate, like a camera would be.
+    ring = None
+    try:
+        source = open_frame_source(spec, loop)
+        connection.send(("frame_size", source.width, source.height))
+        ring = SharedFrameRing((source.height, source.width, 3), slots, name=connection.recv())
+
+        model = preprocessor = None
+        if infer:
+            from movenet.movenet_utils import load_model, warm_up
+            from movenet.preprocessing import FramePreprocessor
+            model = load_model(backend, model_path, num_threads)
+            warm_up(model)
+            preprocessor = FramePreprocessor(model.input_size, model.input_dtype, buffers=1)
+            ring.set_keypoint_shape(model.output_shape)
+
+        interval = 1 / source.fps if source.fps else 0.0
+        delay = 0.0
+        while not connection.poll(delay):
+            start = time.perf_counter()
+            ret, frame = source.read()
+            if not ret:
+                break
+            ring.record_stage(CAPTURE_MS, (time.perf_counter() - start) * 1000)
+            keypoints_with_scores = None
+            if model is not None:
+                inference_start = time.perf_counter()
+                keypoints_with_scores = preprocessor.run_inference(model, preprocessor.preprocess(frame))
+                ring.record_stage(INFERENCE_MS, (time.perf_counter() - inference_start) * 1000)
+            ring.write(frame, keypoints_with_scores, start)
+            delay = max(0.0, interval - (time.perf_counter() - start))
+        source.release()
+    except Exception as error:
+        connection.send(("error", repr(error)))
+    finally:
+        if ring is not None:
+            ring.control[FINISHED] = 1
+            ring.close()
+
+
+class CaptureProcess(FrameSource):
+    # Runs the frame source, and optionally the pose model, in a separate
+    # process so camera stalls and decoding never hold up the render loop
+    # and a second core is fully used. Frames and keypoints arrive through a
+    # SharedFrameRing.
+    #
+    # Without infer it is a FrameSource whose read() returns a copy of the
+    # newest frame. With infer the child mirrors and letterboxes like
+    # FramePreprocessor, and this object stands in for the PosePipeline
+    # (latest(), finished, stats()).
+    def __init__(self, spec, loop=False, slots=4, infer=False, backend="thunder", model_path=None, num_threads=None):
+        super().__init__()
+        self.spec = spec
+        self.loop = loop
+        self.slots = slots
+        self.runs_inference = infer
+        self.backend = backend
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self.ring = None
+        self.process = None
+        self.connection = None
+        self.error = None
+        self.last_read = 0
+        self.last_result = 0
+        self.frames_read = 0
+        self.frames_skipped = 0
+
+    def start(self):
+        # fork keeps main.py from being re-imported in the child; start
+        # before pygame and the model loader thread are initialized
+        context = multiprocessing.get_context("fork")
+        # Start the resource tracker first so the child shares it instead of
+        # starting its own, which would unlink the ring when the child exits
+        resource_tracker.ensure_running()
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=capture_worker,
+            args=(self.spec, self.loop, self.slots, self.runs_inference, self.backend, self.model_path, self.num_threads, child_connection),
+            name="capture",
+            daemon=True,
+        )
+        self.process.start()
+        message = self.connection.recv()
+        if message[0] == "error":
+            self.process.join()
+            raise RuntimeError(f"Capture process failed: {message[1]}")
+        _, self.width, self.height = message
+        self.ring = SharedFrameRing((self.height, self.width, 3), self.slots)
+        self.connection.send(self.ring.name)
+        return self
+
+    def check_error(self):
+        # The child reports failures (e.g. the model not loading) over the pipe
+        if self.error is None and self.connection is not None:
+            try:
+                if self.connection.poll():
+                    message = self.connection.recv()
+                    if message[0] == "error":
+                        self.error = RuntimeError(f"Capture process failed: {message[1]}")
+            except (EOFError, OSError):
+                pass
+        return self.error
+
+    @property
+    def finished(self):
+        if self.check_error() is not None:
+            return True
+        return self.process is None or not self.process.is_alive() or bool(self.ring.control[FINISHED])
+
+    def read(self):
+        # Wait for a frame newer than the last one read and return a copy of
+        # its slot, since the writer reuses the slot once it laps the ring.
+        # A slot rewritten while it was being copied is dropped.
+        while True:
+            latest = self.ring.latest()
+            if latest is not None and latest[0] > self.last_read:
+                sequence, slot = latest
+                frame = self.ring.frames[slot].copy()
+                if self.ring.slot_sequence[slot] != sequence:
+                    continue
+                self.frames_skipped += sequence - self.last_read - 1
+                self.frames_read += 1
+                self.last_read = sequence
+                return True, frame
+            if self.finished:
+                return False, None
+            time.sleep(0.001)
+
+    def latest(self):
+        # Newest (keypoints_with_scores, capture timestamp), like PosePipeline
+        if self.check_error() is not None:
+            return None
+        shape = self.ring.keypoint_shape()
+        if not shape:
+            return None
+        while True:
+            latest = self.ring.latest()
+            if latest is None:
+                return None
+            sequence, slot = latest
+            # Copied, as callers such as PersonTracker keep slices of it
+            keypoints_with_scores = self.ring.keypoints[slot, :int(np.prod(shape))].reshape(shape).copy()
+            timestamp = float(self.ring.slot_time[slot])
+            if self.ring.slot_sequence[slot] == sequence:
+                break
+        if sequence != self.last_result:
+            self.frames_skipped += max(sequence - self.last_result - 1, 0)
+            self.frames_read += 1
+            self.last_result = sequence
+        return keypoints_with_scores, timestamp
+
+    def last_inference_ms(self):
+        return float(self.ring.stage_ms[INFERENCE_MS])
+
+    def stats(self):
+        stats = {
+            "frames_written": int(self.ring.control[LATEST_SEQUENCE]),
+            "frames_read": self.frames_read,
+            "frames_skipped": self.frames_skipped,
+            "capture": {"last_ms": round(float(self.ring.stage_ms[CAPTURE_MS]), 2), "average_ms": round(float(self.ring.stage_ms[CAPTURE_MS + 1]), 2)},
+        }
+        if self.runs_inference:
+            stats["inference"] = {"last_ms": round(float(self.ring.stage_ms[INFERENCE_MS]), 2), "average_ms": round(float(self.ring.stage_ms[INFERENCE_MS + 1]), 2)}
+        return stats
+
+    def bottleneck(self):
+        if self.runs_inference and self.ring.stage_ms[INFERENCE_MS + 1] > self.ring.stage_ms[CAPTURE_MS + 1]:
+            return "inference"
+        return "capture"
+
+    def stop(self, timeout=1.0):
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            self.connection.send("stop")
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.process = None
+
+    def release(self):
+        self.stop()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
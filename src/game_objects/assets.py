@@ -0,0 +1,100 @@
+import pygame
+
+
+class AssetCache:
+    # Process-wide registry of decoded images and sounds. Every game object asks
+    # the cache for its assets, so each file is read from disk exactly once and
+    # all instances share the same Surface / Sound objects.
+    def __init__(self):
+        self.images = {}
+        self.sounds = {}
+        self.scaled_images = {}
+        self.hits = 0
+        self.misses = 0
+
+    def image(self, path):
+        surface = self.images.get(path)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = pygame.image.load(path)
+        # convert_alpha needs a display mode; images loaded before the window
+        # exists are kept in their file format
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        self.images[path] = surface
+        return surface
+
+    def scaled_image(self, path, scale_factor):
+        # Scaled copies are cached by (asset, scale) so render paths never
+        # call pygame.transform.scale per frame
+        if scale_factor == 1:
+            return self.image(path)
+
+        key = (path, scale_factor)
+        surface = self.scaled_images.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        image = self.image(path)
+        surface = pygame.transform.scale(image, (int(image.get_width() * scale_factor), int(image.get_height() * scale_factor)))
+        self.scaled_images[key] = surface
+        return surface
+
+    def sound(self, path):
+        sound = self.sounds.get(path)
+        if sound is not None:
+            self.hits += 1
+            return sound
+
+        self.misses += 1
+        sound = pygame.mixer.Sound(path)
+        self.sounds[path] = sound
+        return sound
+
+    def preload(self, image_paths=(), sound_paths=()):
+        # Warm the cache so the spawn and slice paths never touch the disk
+        for path in image_paths:
+            self.image(path)
+        for path in sound_paths:
+            self.sound(path)
+
+    def image_bytes(self):
+        surfaces = list(self.images.values()) + list(self.scaled_images.values())
+        return sum(surface.get_bytesize() * surface.get_width() * surface.get_height() for surface in surfaces)
+
+    def sound_bytes(self):
+        mixer_settings = pygame.mixer.get_init()
+        if mixer_settings is None:
+            return 0
+        frequency, sample_format, channels = mixer_settings
+        bytes_per_second = frequency * channels * (abs(sample_format) // 8)
+        return int(sum(sound.get_length() * bytes_per_second for sound in self.sounds.values()))
+
+    def resident_bytes(self):
+        return self.image_bytes() + self.sound_bytes()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "images": len(self.images),
+            "scaled_images": len(self.scaled_images),
+            "sounds": len(self.sounds),
+            "resident_bytes": self.resident_bytes(),
+        }
+
+    def clear(self):
+        self.images.clear()
+        self.sounds.clear()
+        self.scaled_images.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Shared instance used by all game objects
+assets = AssetCache()
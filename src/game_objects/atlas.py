@@ -0,0 +1,118 @@
+import pygame
+from game_objects.assets import assets
+from game_objects.dirty_rects import dirty_rects
+
+
+class Sprite:
+    # A pre-scaled image, either a standalone surface or a region of an atlas page
+    def __init__(self, surface, area=None):
+        self.surface = surface
+        self.area = area
+        if area is not None:
+            self.width, self.height = area.width, area.height
+        else:
+            self.width, self.height = surface.get_size()
+
+    def get_width(self):
+        return self.width
+
+    def get_height(self):
+        return self.height
+
+    def image(self):
+        # Standalone surface view of the sprite (shares pixels with the atlas page)
+        if self.area is None:
+            return self.surface
+        return self.surface.subsurface(self.area)
+
+    def blit(self, screen, position):
+        return dirty_rects.add(screen.blit(self.surface, position, self.area))
+
+
+class SpriteAtlas:
+    # Packs scaled sprites keyed by (asset path, scale factor) into a few large
+    # pages once at startup, so the render loop only has to blit regions.
+    def __init__(self, page_size=2048, padding=1):
+        self.page_size = page_size
+        self.padding = padding
+        self.pages = []
+        self.sprites = {}
+        self.fades = {}
+
+    def sprite(self, path, scale_factor=1):
+        key = (path, scale_factor)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            # Not packed yet: fall back to a cached standalone scaled surface
+            sprite = Sprite(assets.scaled_image(path, scale_factor))
+            self.sprites[key] = sprite
+        return sprite
+
+    def fade_frames(self, path, scale_factor=1, steps=32):
+        # Precomputed fade-out of a sprite: frame k has alpha 1 - k / steps.
+        # Shared by every instance, so fading costs one blit per frame and
+        # memory does not grow with the number of live effects.
+        key = (path, scale_factor, steps)
+        frames = self.fades.get(key)
+        if frames is None:
+            image = self.sprite(path, scale_factor).image()
+            frames = []
+            for step in range(steps):
+                transparency = int((1 - step / steps) * 255)
+                frame = image.copy()
+                frame.fill((255, 255, 255, transparency), special_flags=pygame.BLEND_RGBA_MULT)
+                frames.append(Sprite(frame))
+            self.fades[key] = frames
+        return frames
+
+    def build(self, entries):
+        # Shelf packing: tallest images first, left to right, new shelf when a
+        # row is full and new page when the shelves reach the bottom
+        images = {}
+        for path, scale_factor in entries:
+            images[(path, scale_factor)] = assets.scaled_image(path, scale_factor)
+
+        order = sorted(images, key=lambda key: images[key].get_height(), reverse=True)
+        placements = []
+        page_index, x, y, shelf_height = 0, 0, 0, 0
+        page_extents = [[0, 0]]
+        for key in order:
+            width, height = images[key].get_size()
+            if width > self.page_size or height > self.page_size:
+                continue
+            if x + width > self.page_size:
+                x, y, shelf_height = 0, y + shelf_height + self.padding, 0
+            if y + height > self.page_size:
+                page_index, x, y, shelf_height = page_index + 1, 0, 0, 0
+                page_extents.append([0, 0])
+            placements.append((key, page_index, pygame.Rect(x, y, width, height)))
+            page_extents[page_index][0] = max(page_extents[page_index][0], x + width)
+            page_extents[page_index][1] = max(page_extents[page_index][1], y + height)
+            x += width + self.padding
+            shelf_height = max(shelf_height, height)
+
+        pages = []
+        for width, height in page_extents:
+            page = pygame.Surface((max(width, 1), max(height, 1)), pygame.SRCALPHA)
+            if pygame.display.get_surface() is not None:
+                page = page.convert_alpha()
+            page.fill((0, 0, 0, 0))
+            pages.append(page)
+
+        for key, page_index, rect in placements:
+            # Additive blit onto a cleared page copies the pixels exactly,
+            # alpha channel included
+            pages[page_index].blit(images[key], rect, special_flags=pygame.BLEND_RGBA_ADD)
+            self.sprites[key] = Sprite(pages[page_index], rect)
+
+        self.pages = pages
+        return pages
+
+    def clear(self):
+        self.pages = []
+        self.sprites.clear()
+        self.fades.clear()
+
+
+# Shared atlas used by all game objects
+atlas = SpriteAtlas()
@@ -0,0 +1,94 @@
+import random
+
+import pygame
+
+from game_objects.assets import assets
+
+
+class ChannelGroup:
+    # A fixed set of mixer channels for one kind of effect. A new sound takes
+    # an idle channel, or stops the group's oldest voice when all are busy,
+    # so a burst of slices can never crowd out explosions (or each other).
+    def __init__(self, name, channels, sounds):
+        self.name = name
+        self.channels = channels
+        self.sounds = sounds
+        # Play order of the sound on each channel, to find the oldest voice
+        self.started = [0] * len(channels)
+        self.plays = 0
+        self.steals = 0
+        # Own random stream, so picking a sound variant never shifts the
+        # shared one that spawning (and --seed replays) depend on
+        self.random = random.Random()
+
+    def play(self, order):
+        sound = self.sounds[0] if len(self.sounds) == 1 else self.random.choice(self.sounds)
+        index = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                index = i
+                break
+        if index is None:
+            index = self.started.index(min(self.started))
+            self.steals += 1
+        self.channels[index].play(sound)
+        self.started[index] = order
+        self.plays += 1
+        return self.channels[index]
+
+    def busy(self):
+        return sum(channel.get_busy() for channel in self.channels)
+
+    def stats(self):
+        return {"voices": len(self.channels), "busy": self.busy(), "plays": self.plays, "steals": self.steals}
+
+
+class AudioManager:
+    # Sound effects by group name. init() decodes every group's sounds once
+    # (through the asset cache) and reserves a block of mixer channels per
+    # group, so playing an effect is a channel lookup with no decoding or
+    # allocation. Without a mixer (no audio device) effects are counted and
+    # skipped. Works with the SDL dummy audio driver.
+    def __init__(self):
+        self.specs = {}
+        self.groups = {}
+        self.order = 0
+        self.muted = 0
+
+    def add_group(self, name, voices, sound_paths):
+        self.specs[name] = (voices, list(sound_paths))
+
+    def init(self):
+        # Call after pygame.init(); safe to call again after adding groups
+        self.groups = {}
+        if pygame.mixer.get_init() is None:
+            print("[audio] no audio device, sound effects are muted")
+            return self
+        total = sum(voices for voices, _ in self.specs.values())
+        pygame.mixer.set_num_channels(total)
+        # Reserved channels are never picked by Sound.play(), only by the groups
+        pygame.mixer.set_reserved(total)
+        first = 0
+        for name, (voices, sound_paths) in self.specs.items():
+            channels = [pygame.mixer.Channel(first + i) for i in range(voices)]
+            self.groups[name] = ChannelGroup(name, channels, [assets.sound(path) for path in sound_paths])
+            first += voices
+        return self
+
+    def play(self, name):
+        group = self.groups.get(name)
+        if group is None:
+            self.muted += 1
+            return None
+        self.order += 1
+        return group.play(self.order)
+
+    def stats(self):
+        stats = {name: group.stats() for name, group in self.groups.items()}
+        if self.muted:
+            stats["muted"] = self.muted
+        return stats
+
+
+# Shared instance used by all game objects
+audio = AudioManager()
@@ -0,0 +1,41 @@
+import numpy as np
+
+
+def sweep_segments(hand_keypoints):
+    # Line segments covered by every hand since the previous call, as two
+    # (S, 2) arrays of start and end points plus the index of the hand each
+    # segment belongs to. A hand that has not moved gives a zero-length
+    # segment, which behaves like the old point test.
+    starts, ends, owners = [], [], []
+    for hand_index, keypoint in enumerate(hand_keypoints):
+        path = keypoint.take_sweep()
+        if len(path) == 1:
+            path = path * 2
+        starts.extend(path[:-1])
+        ends.extend(path[1:])
+        owners.extend([hand_index] * (len(path) - 1))
+    return np.array(starts, dtype=np.float32).reshape(-1, 2), np.array(ends, dtype=np.float32).reshape(-1, 2), np.array(owners, dtype=np.intp)
+
+
+def segment_distances_squared(points, starts, ends):
+    # (N, S) squared distance from every point to every segment
+    direction = ends - starts
+    length_squared = (direction ** 2).sum(axis=1)
+    offset = points[:, None, :] - starts[None, :, :]
+    t = (offset * direction[None, :, :]).sum(axis=2) / np.maximum(length_squared, 1e-6)[None, :]
+    t = np.clip(t, 0.0, 1.0)
+    closest = starts[None, :, :] + t[:, :, None] * direction[None, :, :]
+    return ((points[:, None, :] - closest) ** 2).sum(axis=2)
+
+
+def nearest_segments(points, starts, ends, collision_distance=50):
+    # Index of the closest blade segment within collision_distance of every
+    # point, or -1 for points nothing swept past
+    points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+    if len(points) == 0 or len(starts) == 0:
+        return np.full(len(points), -1, dtype=np.intp)
+    distances = segment_distances_squared(points, starts, ends)
+    nearest = distances.argmin(axis=1)
+    hit = distances[np.arange(len(points)), nearest] <= collision_distance ** 2
+    return np.where(hit, nearest, -1)
+
@@ -0,0 +1,88 @@
+import pygame
+
+
+class DirtyRectTracker:
+    # Collects the screen rects touched by sprite and UI draws during a frame.
+    # Disabled (and free apart from one attribute check) unless the dirty-rect
+    # renderer is in use.
+    def __init__(self):
+        self.enabled = False
+        self.rects = []
+
+    def add(self, rect):
+        if self.enabled and rect:
+            self.rects.append(rect)
+        return rect
+
+    def add_all(self, rects):
+        if self.enabled:
+            self.rects.extend(rect for rect in rects if rect)
+
+    def take(self):
+        rects = self.rects
+        self.rects = []
+        return rects
+
+
+# Shared tracker used by every draw call
+dirty_rects = DirtyRectTracker()
+
+
+class DirtyRectRenderer:
+    # Instead of blitting the whole background and flipping every frame, only
+    # the regions drawn last frame are restored from the background and only
+    # the regions touched this frame or last frame are pushed to the display.
+    # Falls back to a full flip when the dirty area is a large part of the screen.
+    def __init__(self, screen, background, full_flip_ratio=0.5, tracker=dirty_rects):
+        self.screen = screen
+        self.background = background
+        self.full_flip_ratio = full_flip_ratio
+        self.tracker = tracker
+        self.screen_rect = screen.get_rect()
+        self.screen_area = self.screen_rect.width * self.screen_rect.height
+        self.previous_rects = []
+        self.needs_full_redraw = True
+        self.frames = 0
+        self.full_flips = 0
+        self.pixels_pushed = 0
+        self.last_pixels_pushed = 0
+        tracker.enabled = True
+
+    def invalidate(self):
+        # Redraw and push the whole screen next frame (e.g. after a full-screen overlay)
+        self.needs_full_redraw = True
+
+    def begin_frame(self):
+        self.tracker.take()
+        if self.needs_full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            # Erase last frame's sprites by restoring the background under them
+            self.screen.blits([(self.background, rect, rect) for rect in self.previous_rects], doreturn=False)
+
+    def end_frame(self):
+        current_rects = [rect.clip(self.screen_rect) for rect in self.tracker.take()]
+        update_rects = [rect for rect in self.previous_rects + current_rects if rect.width and rect.height]
+        dirty_area = sum(rect.width * rect.height for rect in update_rects)
+
+        if self.needs_full_redraw or dirty_area >= self.full_flip_ratio * self.screen_area:
+            pygame.display.flip()
+            self.full_flips += 1
+            pushed = self.screen_area
+        else:
+            pygame.display.update(update_rects)
+            pushed = dirty_area
+
+        self.previous_rects = current_rects
+        self.needs_full_redraw = False
+        self.frames += 1
+        self.last_pixels_pushed = pushed
+        self.pixels_pushed += pushed
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "full_flips": self.full_flips,
+            "average_pixels_per_frame": round(self.pixels_pushed / self.frames) if self.frames else 0,
+            "screen_pixels": self.screen_area,
+        }
@@ -0,0 +1,202 @@
+import random
+
+import numpy as np
+
+from game_objects.assets import assets
+from game_objects.atlas import atlas
+from game_objects.audio import audio
+from game_objects.blade import nearest_segments
+from game_objects.dirty_rects import dirty_rects
+from game_objects.game_item import GameItem, splash_effect_pool
+
+# Entity kinds
+ITEM = 0
+HALF = 1
+
+ITEM_TYPES = list(GameItem.item_images)
+BOMB = ITEM_TYPES.index("bomb")
+
+
+class EntityStore:
+    # Structure-of-arrays store for whole items and sliced halves. Gravity,
+    # hand collisions and bounds checks run as a handful of NumPy operations
+    # over every live entity instead of one Python call per object; dead
+    # entries are compacted in place at the end of each frame.
+    def __init__(self, screen, screen_width, screen_height, capacity=1024):
+        self.screen = screen
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.count = 0
+        # Cap on live halves, set by the adaptive quality governor
+        self.max_halves = None
+
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        # Positions before the last simulation step, for interpolated rendering
+        self.prev_x = np.zeros(capacity, dtype=np.float32)
+        self.prev_y = np.zeros(capacity, dtype=np.float32)
+        self.x_speed = np.zeros(capacity, dtype=np.float32)
+        self.y_speed = np.zeros(capacity, dtype=np.float32)
+        self.gravity = np.zeros(capacity, dtype=np.float32)
+        self.width = np.zeros(capacity, dtype=np.float32)
+        self.height = np.zeros(capacity, dtype=np.float32)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.item_type = np.zeros(capacity, dtype=np.int8)
+        self.sprite_id = np.zeros(capacity, dtype=np.int16)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        # Sprites are referenced by index so the arrays stay numeric
+        self.sprites = []
+        self.sprite_ids = {}
+
+    @property
+    def capacity(self):
+        return len(self.x)
+
+    def sprite_index(self, path):
+        sprite_id = self.sprite_ids.get(path)
+        if sprite_id is None:
+            sprite_id = len(self.sprites)
+            self.sprites.append(atlas.sprite(path, GameItem.scale_factor))
+            self.sprite_ids[path] = sprite_id
+        return sprite_id
+
+    def grow(self):
+        # Double every array when the store is full
+        for name in ("x", "y", "prev_x", "prev_y", "x_speed", "y_speed", "gravity", "width", "height", "kind", "item_type", "sprite_id", "alive"):
+            array = getattr(self, name)
+            grown = np.zeros(len(array) * 2, dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def add(self, kind, item_type, path, x, y, x_speed, y_speed, gravity):
+        if self.count == self.capacity:
+            self.grow()
+        index = self.count
+        sprite_id = self.sprite_index(path)
+        sprite = self.sprites[sprite_id]
+        self.x[index], self.y[index] = x, y
+        self.prev_x[index], self.prev_y[index] = x, y
+        self.x_speed[index], self.y_speed[index] = x_speed, y_speed
+        self.gravity[index] = gravity
+        self.width[index], self.height[index] = sprite.width, sprite.height
+        self.kind[index] = kind
+        self.item_type[index] = item_type
+        self.sprite_id[index] = sprite_id
+        self.alive[index] = True
+        self.count += 1
+        return index
+
+    def spawn_item(self, item_type, difficulty_multiplier=1.0):
+        # Same launch rules as GameItem
+        path = GameItem.bomb_image_path if item_type == "bomb" else GameItem.item_images[item_type]
+        spawn_width = int(assets.image(GameItem.item_images[item_type]).get_width() * GameItem.scale_factor)
+        x = random.randint(0, self.screen_width - spawn_width)
+        x_speed = random.randint(-3, 3)
+        y_speed = random.randint(-23, -18) * difficulty_multiplier
+        gravity = self.screen_height * 0.001 * difficulty_multiplier
+        return self.add(ITEM, ITEM_TYPES.index(item_type), path, x, self.screen_height, x_speed, y_speed, gravity)
+
+    def spawn_halves(self, item_type_index, x, y):
+        # Same motion as SlicedFruit, one entity per half
+        if self.max_halves is not None:
+            n = self.count
+            if np.count_nonzero(self.alive[:n] & (self.kind[:n] == HALF)) + 2 > self.max_halves:
+                return
+        item_type = ITEM_TYPES[item_type_index]
+        gravity = self.screen_height * 0.0015
+        for path in GameItem.half_images[item_type]:
+            self.add(HALF, item_type_index, path, x, y, random.uniform(-1, 1), random.uniform(-3, -1), gravity)
+
+    def update_positions(self):
+        # One fixed simulation step
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        self.x[:n] += self.x_speed[:n]
+        self.y[:n] += self.y_speed[:n]
+        # Apply gravity
+        self.y_speed[:n] += self.gravity[:n]
+
+    def render_positions(self, indices, alpha=1.0):
+        # Positions between the last two simulation steps
+        x, y = self.x[indices], self.y[indices]
+        if alpha < 1.0:
+            x = self.prev_x[indices] + (x - self.prev_x[indices]) * alpha
+            y = self.prev_y[indices] + (y - self.prev_y[indices]) * alpha
+        return x, y
+
+    def check_collisions(self, blade_starts, blade_ends, collision_distance=50, alpha=1.0):
+        # Indices of live items whose centre, where it is drawn this frame, is
+        # within collision_distance of any blade segment swept since the last
+        # frame, and the segment that hit each of them
+        n = self.count
+        if n == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        x, y = self.render_positions(slice(0, n), alpha)
+        centers = np.stack((x + self.width[:n] // 2, y + self.height[:n] // 2), axis=1)
+        segments = nearest_segments(centers, blade_starts, blade_ends, collision_distance)
+        hit = np.flatnonzero((segments >= 0) & (self.kind[:n] == ITEM) & self.alive[:n])
+        return hit, segments[hit]
+
+    def apply_effect(self, index):
+        # Slice or explode item index; mirrors GameItem.apply_effect
+        self.alive[index] = False
+        x, y = float(self.x[index]), float(self.y[index])
+        item_type_index = int(self.item_type[index])
+        if item_type_index == BOMB:
+            audio.play("explosion")
+            atlas.sprite(GameItem.explosion_image_path).blit(self.screen, (x, y))
+            return "bomb", None, None
+
+        audio.play("slice")
+        item_type = ITEM_TYPES[item_type_index]
+        splash_effect = splash_effect_pool.acquire(self.screen, x, y, GameItem.splash_images[item_type], GameItem.scale_factor)
+        self.spawn_halves(item_type_index, x, y)
+        return "fruit", None, splash_effect
+
+    def remove_out_of_bounds(self):
+        n = self.count
+        items = self.kind[:n] == ITEM
+        below = self.y[:n] > self.screen_height
+        sideways = (self.x[:n] < -self.width[:n]) | (self.x[:n] > self.screen_width)
+        self.alive[:n] &= ~(below | (items & sideways))
+
+    def compact(self):
+        # Move live entities to the front of every array, preserving order
+        n = self.count
+        live = np.flatnonzero(self.alive[:n])
+        if len(live) == n:
+            return
+        k = len(live)
+        for array in (self.x, self.y, self.prev_x, self.prev_y, self.x_speed, self.y_speed, self.gravity, self.width, self.height, self.kind, self.item_type, self.sprite_id, self.alive):
+            array[:k] = array[live]
+        self.alive[k:n] = False
+        self.count = k
+
+    def render(self, kind, alpha=1.0):
+        # Blit every live entity of one kind, reading positions from the arrays
+        n = self.count
+        indices = np.flatnonzero(self.alive[:n] & (self.kind[:n] == kind))
+        if len(indices) == 0:
+            return
+        sprites = self.sprites
+        xs, ys = self.render_positions(indices, alpha)
+        blits = [
+            (sprites[sprite_id].surface, (x, y), sprites[sprite_id].area)
+            for sprite_id, x, y in zip(self.sprite_id[indices].tolist(), xs.tolist(), ys.tolist())
+        ]
+        if dirty_rects.enabled:
+            dirty_rects.add_all(self.screen.blits(blits))
+        else:
+            self.screen.blits(blits, doreturn=False)
+
+    def live_counts(self):
+        n = self.count
+        items = int(np.count_nonzero(self.alive[:n] & (self.kind[:n] == ITEM)))
+        halves = int(np.count_nonzero(self.alive[:n] & (self.kind[:n] == HALF)))
+        return {"items": items, "halves": halves}
+
+    def clear(self):
+        self.alive[:self.count] = False
+        self.count = 0
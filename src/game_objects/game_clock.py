@@ -0,0 +1,82 @@
+import time
+
+# Physics constants (launch speeds, gravity) are per simulation step and were
+# tuned for the game running at about 30 frames per second
+SIMULATION_RATE = 30
+
+
+class GameClock:
+    # The one clock gameplay runs on. Simulation time only moves while the
+    # game is being played and always in fixed steps of 1 / SIMULATION_RATE,
+    # however fast or slow frames are rendered: advance() adds the real time
+    # since the last frame to an accumulator and returns how many steps to
+    # run. At most max_steps run per frame; time beyond that is dropped, so a
+    # long stall slows the game down instead of making it spiral.
+    #
+    # alpha is how far the current frame is between the last two simulation
+    # states, for interpolated rendering; now() is the time of that
+    # interpolated state.
+    #
+    # With frame_locked (replaying a trace or video file) every frame is
+    # exactly one step and frame_time() counts frames instead of reading the
+    # wall clock, so a replay with the same --seed plays out the same way
+    # however fast the machine renders it.
+    def __init__(self, rate=SIMULATION_RATE, max_steps=5, frame_locked=False):
+        self.step_seconds = 1 / rate
+        self.max_steps = max_steps
+        self.frame_locked = frame_locked
+        self.time = 0.0
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.last_real = None
+        self.frames = 0
+        self.steps = 0
+        self.dropped_seconds = 0.0
+
+    def frame_time(self):
+        # Timestamp of the current frame, for wrist filters and hover timers
+        if self.frame_locked:
+            return self.frames * self.step_seconds
+        return time.perf_counter()
+
+    def advance(self, running=True):
+        if self.frame_locked:
+            self.frames += 1
+            self.alpha = 1.0
+            return 1 if running else 0
+        real = time.perf_counter()
+        elapsed = 0.0 if self.last_real is None else real - self.last_real
+        self.last_real = real
+        if not running:
+            return 0
+        self.accumulator += elapsed
+        steps = int(self.accumulator / self.step_seconds)
+        if steps > self.max_steps:
+            dropped = (steps - self.max_steps) * self.step_seconds
+            self.accumulator -= dropped
+            self.dropped_seconds += dropped
+            steps = self.max_steps
+        self.accumulator -= steps * self.step_seconds
+        self.alpha = min(self.accumulator / self.step_seconds, 1.0)
+        return steps
+
+    def tick(self):
+        # Called once per simulation step, after it has run
+        self.time += self.step_seconds
+        self.steps += 1
+
+    def now(self):
+        return self.time - (1.0 - self.alpha) * self.step_seconds
+
+    def stats(self):
+        return {
+            "rate": round(1 / self.step_seconds),
+            "frame_locked": self.frame_locked,
+            "steps": self.steps,
+            "simulated_s": round(self.time, 2),
+            "dropped_s": round(self.dropped_seconds, 2),
+        }
+
+
+# Shared clock for physics, effects, spawning and the difficulty ramp
+game_clock = GameClock()
@@ -1,49 +1,72 @@
 import pygame
-import os
+import collections
 import random
 import math
 import pygame.freetype
+from game_objects.assets import assets
+from game_objects.audio import audio
+from game_objects.atlas import atlas
+from game_objects.dirty_rects import dirty_rects
+from game_objects.game_clock import game_clock
+from game_objects.text_cache import fonts, text_cache
+from game_objects.pool import ObjectPool
 
 class GameItem:
+    __slots__ = (
+        "screen", "screen_width", "screen_height", "difficulty", "item_type",
+        "main_image_path", "main_image", "half_1_image", "half_2_image", "explosion_image",
+        "sprite", "image_path", "image", "rect",
+        "x", "y", "prev_x", "prev_y", "x_speed", "y_speed", "horizontal_speed", "vertical_speed",
+    )
+
     difficulty_multiplier = 1.0
+    scale_factor = 1
+
+    # Setup image paths
+    item_images = {
+        "apple": "assets/images/apple_small.png",
+        "banana": "assets/images/banana_small.png",
+        "coconut": "assets/images/coconut_small.png",
+        "orange": "assets/images/orange_small.png",
+        "pineapple": "assets/images/pineapple_small.png",
+        "watermelon": "assets/images/watermelon_small.png",
+        "bomb": "assets/images/bomb_small.png"
+    }
+
+    # Setup splash image paths
+    splash_images = {
+        "apple": "assets/images/splash_red_small.png",
+        "banana": "assets/images/splash_yellow_small.png",
+        "coconut": "assets/images/splash_transparent_small.png",
+        "orange": "assets/images/splash_orange_small.png",
+        "pineapple": "assets/images/splash_yellow_small.png",
+        "watermelon": "assets/images/splash_red_small.png"
+    }
+
+    # Setup half image paths
+    half_images = {
+        "apple": ["assets/images/apple_half_1_small.png", "assets/images/apple_half_2_small.png"],
+        "banana": ["assets/images/banana_half_1_small.png", "assets/images/banana_half_2_small.png"],
+        "coconut": ["assets/images/coconut_half_1_small.png", "assets/images/coconut_half_2_small.png"],
+        "orange": ["assets/images/orange_half_1_small.png", "assets/images/orange_half_2_small.png"],
+        "pineapple": ["assets/images/pineapple_half_1_small.png", "assets/images/pineapple_half_2_small.png"],
+        "watermelon": ["assets/images/watermelon_half_1_small.png", "assets/images/watermelon_half_2_small.png"]
+    }
+
+    bomb_image_path = "assets/images/bomb.png"
+    explosion_image_path = "assets/images/explosion.png"
+    slice_sound = "assets/sounds/slice_sound.wav"
+    explosion_sound = "assets/sounds/explosion_sound.wav"
+
     def __init__(self, screen, screen_width, screen_height, item_type, difficulty_multiplier=1.0):
+        self.reset(screen, screen_width, screen_height, item_type, difficulty_multiplier)
+
+    def reset(self, screen, screen_width, screen_height, item_type, difficulty_multiplier=1.0):
+        # (Re)launch the item; called by __init__ and when reused from game_item_pool
         self.screen = screen
         self.screen_width = screen_width
         self.screen_height = screen_height
-        self.scale_factor = 1
-        self.difficulty_multiplier = difficulty_multiplier
-        # Setup image paths
-        self.item_images = {
-            "apple": "assets/images/apple_small.png",
-            "banana": "assets/images/banana_small.png",
-            "coconut": "assets/images/coconut_small.png",
-            "orange": "assets/images/orange_small.png",
-            "pineapple": "assets/images/pineapple_small.png",
-            "watermelon": "assets/images/watermelon_small.png",
-            "bomb": "assets/images/bomb_small.png"
-        }
-
-        # Setup splash image paths
-        self.splash_images = {
-            "apple": "assets/images/splash_red_small.png",
-            "banana": "assets/images/splash_yellow_small.png",
-            "coconut": "assets/images/splash_transparent_small.png",
-            "orange": "assets/images/splash_orange_small.png",
-            "pineapple": "assets/images/splash_yellow_small.png",
-            "watermelon": "assets/images/splash_red_small.png"
-        }
-
-        # Setup half image paths
-        self.half_images = {
-            "apple": ["assets/images/apple_half_1_small.png", "assets/images/apple_half_2_small.png"],
-            "banana": ["assets/images/banana_half_1_small.png", "assets/images/banana_half_2_small.png"],
-            "coconut": ["assets/images/coconut_half_1_small.png", "assets/images/coconut_half_2_small.png"],
-            "orange": ["assets/images/orange_half_1_small.png", "assets/images/orange_half_2_small.png"],
-            "pineapple": ["assets/images/pineapple_half_1_small.png", "assets/images/pineapple_half_2_small.png"],
-            "watermelon": ["assets/images/watermelon_half_1_small.png", "assets/images/watermelon_half_2_small.png"]
-        }
-        
-
+        self.difficulty = difficulty_multiplier
         if item_type in ["fruit_1", "fruit_2", "fruit_3"]:
             self.item_type = random.choice(list(self.item_images.keys()))
             self.item_type = "bomb" if self.item_type == "bomb" else self.item_type
@@ -53,7 +76,7 @@ class GameItem:
         self.load_images()
 
         self.image_path = self.item_images[self.item_type]
-        self.image = pygame.image.load(self.image_path)
+        self.image = assets.image(self.image_path)
 
         self.rect = self.image.get_rect()
         
@@ -65,35 +88,29 @@ class GameItem:
         self.rect.y = screen_height
         self.x = self.rect.x
         self.y = self.rect.y
+        self.prev_x, self.prev_y = self.x, self.y
         self.x_speed = random.randint(-3, 3)
-        self.y_speed = random.randint(-23, -18) * self.difficulty_multiplier
+        self.y_speed = random.randint(-23, -18) * self.difficulty
 
 
     def load_images(self):
         # Load the main image and its corresponding sliced images or explosion image
-        # Based on the item_type, set the corresponding images and sound effect for slicing or exploding
-        image_folder = "assets/images"
-
+        # Based on the item_type, set the corresponding images for slicing or exploding
         if self.item_type != "bomb":
-            main_image_path = os.path.join(image_folder, f"{self.item_type}_small.png")
+            main_image_path = self.item_images[self.item_type]
             half_1_path, half_2_path = self.half_images[self.item_type]
             
-            self.main_image = pygame.image.load(main_image_path)
-            self.half_1_image = pygame.image.load(half_1_path)
-            self.half_2_image = pygame.image.load(half_2_path)
-
-            self.sound_path = f"assets/sounds/slice_sound.wav"
+            self.main_image_path = main_image_path
+            self.main_image = assets.image(main_image_path)
+            self.half_1_image = assets.image(half_1_path)
+            self.half_2_image = assets.image(half_2_path)
 
         else:  # item_type is "bomb"
-            bomb_image_path = os.path.join(image_folder, "bomb.png")
-            explosion_image_path = os.path.join(image_folder, "explosion.png")
-
-            self.main_image = pygame.image.load(bomb_image_path)
-            self.explosion_image = pygame.image.load(explosion_image_path)
+            self.main_image_path = self.bomb_image_path
+            self.main_image = assets.image(self.bomb_image_path)
+            self.explosion_image = assets.image(self.explosion_image_path)
 
-            self.sound_path = f"assets/sounds/explosion_sound.wav"
-
-        self.sound_effect = pygame.mixer.Sound(self.sound_path)
+        self.sprite = atlas.sprite(self.main_image_path, self.scale_factor)
 
     def init_position(self):
         # Initialize the position of the game item
@@ -106,7 +123,8 @@ class GameItem:
         self.vertical_speed = random.uniform(-0.015, -0.01) * self.screen_height
 
     def update_position(self):
-        # Update the position of the game item based on its speed
+        # One fixed simulation step: move the game item based on its speed
+        self.prev_x, self.prev_y = self.x, self.y
         self.rect.x += self.x_speed
         self.rect.y += self.y_speed
 
@@ -115,42 +133,36 @@ class GameItem:
         self.y = self.rect.y
 
         # Apply gravity
-        self.y_speed += self.screen_height * 0.001 * self.difficulty_multiplier
+        self.y_speed += self.screen_height * 0.001 * self.difficulty
 
-    def render(self):
-        # Render the game item on the screen
-        scaled_image = pygame.transform.scale(self.main_image, (int(self.main_image.get_width() * self.scale_factor), int(self.main_image.get_height() * self.scale_factor)))
-        self.screen.blit(scaled_image, (self.x, self.y))
-
-    def check_collision(self, hand_keypoints, collision_distance=50):
-        # Check for collision between hand keypoints and the game item
-        for keypoint in hand_keypoints:
-            x, y = int(keypoint.x), int(keypoint.y)  # Get x and y from the HandKeyPoint object
-            scaled_width = int(self.main_image.get_width() * self.scale_factor)
-            scaled_height = int(self.main_image.get_height() * self.scale_factor)
-            distance = ((self.x + scaled_width // 2 - x) ** 2 + (self.y + scaled_height // 2 - y) ** 2) ** 0.5
+    def render_position(self, alpha=1.0):
+        # Position between the last two simulation steps
+        return self.prev_x + (self.x - self.prev_x) * alpha, self.prev_y + (self.y - self.prev_y) * alpha
 
-            if distance <= collision_distance:
-                return True
+    def render(self, alpha=1.0):
+        # Render the game item on the screen
+        self.sprite.blit(self.screen, self.render_position(alpha))
 
-        return False
+    def center(self, alpha=1.0):
+        x, y = self.render_position(alpha)
+        scaled_width = int(self.main_image.get_width() * self.scale_factor)
+        scaled_height = int(self.main_image.get_height() * self.scale_factor)
+        return x + scaled_width // 2, y + scaled_height // 2
 
     def apply_effect(self):
         # Apply the slicing or exploding effect when a collision is detected
-        self.sound_effect.play()
-
         if self.item_type == "bomb":
+            audio.play("explosion")
             # Render the explosion image in place of the bomb
-            self.screen.blit(self.explosion_image, (self.x, self.y))
+            atlas.sprite(self.explosion_image_path).blit(self.screen, (self.x, self.y))
             return "bomb", None, None
 
         else:
-            scaled_width = int(self.main_image.get_width() * self.scale_factor)
-            scaled_height = int(self.main_image.get_height() * self.scale_factor)
+            audio.play("slice")
             splash_image_path = self.splash_images[self.item_type]
-            splash_image = pygame.image.load(splash_image_path)
-            splash_effect = SplashEffect(self.screen, self.x, self.y, splash_image, self.scale_factor)
-            sliced_fruit = SlicedFruit(self.screen, self.x, self.y, self.half_1_image, self.half_2_image, self.scale_factor)
+            half_1_path, half_2_path = self.half_images[self.item_type]
+            splash_effect = splash_effect_pool.acquire(self.screen, self.x, self.y, splash_image_path, self.scale_factor)
+            sliced_fruit = sliced_fruit_pool.acquire(self.screen, self.x, self.y, half_1_path, half_2_path, self.scale_factor)
             return "fruit", sliced_fruit, splash_effect
 
 
@@ -159,13 +171,22 @@ class GameItem:
         return self.x < -self.main_image.get_width() or self.x > self.screen_width or self.y > self.screen_height
 
 class SlicedFruit:
-    def __init__(self, screen, x, y, half_1_image, half_2_image, scale_factor):
+    __slots__ = (
+        "screen", "x1", "y1", "x2", "y2", "prev_x1", "prev_y1", "prev_x2", "prev_y2", "scale_factor", "half_1_sprite", "half_2_sprite",
+        "x_speed1", "y_speed1", "x_speed2", "y_speed2",
+    )
+
+    def __init__(self, screen, x, y, half_1_path, half_2_path, scale_factor):
+        self.reset(screen, x, y, half_1_path, half_2_path, scale_factor)
+
+    def reset(self, screen, x, y, half_1_path, half_2_path, scale_factor):
         self.screen = screen
         self.x1, self.y1 = x, y
         self.x2, self.y2 = x, y
-        self.half_1_image = half_1_image
-        self.half_2_image = half_2_image
+        self.prev_x1, self.prev_y1, self.prev_x2, self.prev_y2 = x, y, x, y
         self.scale_factor = scale_factor
+        self.half_1_sprite = atlas.sprite(half_1_path, scale_factor)
+        self.half_2_sprite = atlas.sprite(half_2_path, scale_factor)
 
         self.x_speed1 = random.uniform(-1, 1)
         self.y_speed1 = random.uniform(-3, -1)
@@ -173,6 +194,7 @@ class SlicedFruit:
         self.y_speed2 = random.uniform(-3, -1)
 
     def update_position(self, screen_height):
+        self.prev_x1, self.prev_y1, self.prev_x2, self.prev_y2 = self.x1, self.y1, self.x2, self.y2
         self.x1 += self.x_speed1
         self.y1 += self.y_speed1
         self.x2 += self.x_speed2
@@ -182,82 +204,130 @@ class SlicedFruit:
         self.y_speed1 += screen_height * 0.0015
         self.y_speed2 += screen_height * 0.0015
 
-    def render(self):
-        scaled_half_1_image = pygame.transform.scale(self.half_1_image, (int(self.half_1_image.get_width() * self.scale_factor), int(self.half_1_image.get_height() * self.scale_factor)))
-        scaled_half_2_image = pygame.transform.scale(self.half_2_image, (int(self.half_2_image.get_width() * self.scale_factor), int(self.half_2_image.get_height() * self.scale_factor)))
-
-        self.screen.blit(scaled_half_1_image, (self.x1, self.y1))
-        self.screen.blit(scaled_half_2_image, (self.x2, self.y2))
+    def render(self, alpha=1.0):
+        self.half_1_sprite.blit(self.screen, (self.prev_x1 + (self.x1 - self.prev_x1) * alpha, self.prev_y1 + (self.y1 - self.prev_y1) * alpha))
+        self.half_2_sprite.blit(self.screen, (self.prev_x2 + (self.x2 - self.prev_x2) * alpha, self.prev_y2 + (self.y2 - self.prev_y2) * alpha))
 
     def out_of_bounds(self, screen_height):
         return self.y1 > screen_height or self.y2 > screen_height
 
 class HandKeyPoint:
-    def __init__(self, x, y, speed=0.6):
+    sword_image_path = "assets/images/sword1.png"
+    scale_factor = 0.8
+
+    def __init__(self, x, y, speed=0.6, trail_length=16, motion_filter=None, reacquire_after=0.5):
         self.x = x
         self.y = y
         self.speed = speed
-
-        self.sword_image = pygame.image.load("assets/images/sword1.png")
-        self.scale_factor = 0.8
-
-    def update_position(self, target_x, target_y):
+        # When the wrist was last detected. A wrist seen for the first time,
+        # or again after reacquire_after seconds, jumps to where it is seen
+        # instead of sweeping (and slicing) its way there.
+        self.last_seen = None
+        self.reacquire_after = reacquire_after
+        # Optional OneEuroFilter / KalmanFilter from movenet.filters. With a
+        # filter, update_position() only feeds it detections and extrapolate()
+        # moves the blade to the predicted wrist position at render time.
+        self.motion_filter = motion_filter
+
+        self.sword_sprite = atlas.sprite(self.sword_image_path, self.scale_factor)
+
+        # Blade trail: recent positions, newest last. new_trail_points counts
+        # the positions not yet used by a collision check.
+        self.trail = collections.deque([(x, y)], maxlen=trail_length)
+        self.new_trail_points = 0
+        self.swept_from = (x, y)
+
+    def seen(self):
+        return self.last_seen is not None
+
+    def update_position(self, target_x, target_y, timestamp=None, confidence=1.0):
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        if self.last_seen is None or timestamp - self.last_seen > self.reacquire_after:
+            self.place(target_x, target_y)
+        self.last_seen = timestamp
+        if self.motion_filter is not None:
+            self.motion_filter.update(target_x, target_y, timestamp, confidence)
+            return
         dx = target_x - self.x
         dy = target_y - self.y
         self.x += dx * self.speed
         self.y += dy * self.speed
+        self.trail.append((self.x, self.y))
+        self.new_trail_points += 1
+
+    def place(self, x, y):
+        # Move the blade without sweeping, e.g. to a wrist seen for the first time
+        if self.motion_filter is not None:
+            self.motion_filter.reset()
+        self.x = x
+        self.y = y
+        self.trail.clear()
+        self.trail.append((x, y))
+        self.new_trail_points = 0
+        self.swept_from = (x, y)
+
+    def extrapolate(self, timestamp):
+        if self.motion_filter is None:
+            return
+        position = self.motion_filter.predict(timestamp)
+        if position is None:
+            return
+        self.x, self.y = position
+        self.trail.append(position)
+        self.new_trail_points += 1
+
+    def take_sweep(self):
+        # Path the blade covered since the last call, starting where it ended
+        new_points = min(self.new_trail_points, len(self.trail))
+        path = [self.swept_from] + list(self.trail)[len(self.trail) - new_points:]
+        self.swept_from = (self.x, self.y)
+        self.new_trail_points = 0
+        return path
 
     def draw(self, screen):
-        scaled_sword_image = pygame.transform.scale(
-            self.sword_image,
-            (
-                int(self.sword_image.get_width() * self.scale_factor),
-                int(self.sword_image.get_height() * self.scale_factor),
-            ),
-        )
-        screen.blit(
-            scaled_sword_image,
+        self.sword_sprite.blit(
+            screen,
             (
-                int(self.x - scaled_sword_image.get_width() // 2),
-                int(self.y - scaled_sword_image.get_height() // 2),
+                int(self.x - self.sword_sprite.width // 2),
+                int(self.y - self.sword_sprite.height // 2),
             ),
         )
 
 import time
 
 class SplashEffect:
-    def __init__(self, screen, x, y, splash_image, scale_factor, duration=3):
+    __slots__ = ("screen", "x", "y", "scale_factor", "fade_frames", "start_time", "duration")
+
+    # List of splash sound file names
+    splash_sound_filenames = [
+        "assets/sounds/splash_sound1.mp3",
+        "assets/sounds/splash_sound2.mp3",
+        "assets/sounds/splash_sound3.mp3",
+        "assets/sounds/splash_sound4.mp3"
+    ]
+
+    def __init__(self, screen, x, y, splash_image_path, scale_factor, duration=3):
+        self.reset(screen, x, y, splash_image_path, scale_factor, duration)
+
+    def reset(self, screen, x, y, splash_image_path, scale_factor, duration=3):
         self.screen = screen
         self.x = x
         self.y = y
-        self.splash_image = splash_image
         self.scale_factor = scale_factor
-        self.start_time = time.time()
+        self.fade_frames = atlas.fade_frames(splash_image_path, scale_factor)
+        # Fades on simulation time, so it holds while the game is paused
+        self.start_time = game_clock.now()
         self.duration = duration
-        # Create a list of splash sound file names
-        splash_sound_filenames = [
-            "assets/sounds/splash_sound1.mp3",
-            "assets/sounds/splash_sound2.mp3",
-            "assets/sounds/splash_sound3.mp3",
-            "assets/sounds/splash_sound4.mp3"
-        ]
-
-        # Load a random splash sound effect
-        chosen_splash_sound = random.choice(splash_sound_filenames)
-        self.splash_sound = pygame.mixer.Sound(chosen_splash_sound)
-
-        # Play the randomly chosen splash sound effect
-        self.splash_sound.play()
+        # Play one of the splash sound effects
+        audio.play("splash")
 
 
     def render(self):
-        elapsed_time = time.time() - self.start_time
+        elapsed_time = game_clock.now() - self.start_time
         if elapsed_time < self.duration:
-            transparency = int((1 - (elapsed_time / self.duration)) * 255)
-            scaled_splash_image = pygame.transform.scale(self.splash_image, (int(self.splash_image.get_width() * self.scale_factor), int(self.splash_image.get_height() * self.scale_factor)))
-            splash_image_copy = scaled_splash_image.copy()
-            splash_image_copy.fill((255, 255, 255, transparency), special_flags=pygame.BLEND_RGBA_MULT)
-            self.screen.blit(splash_image_copy, (self.x, self.y))
+            # Pick the precomputed fade step for the elapsed time
+            step = int(elapsed_time / self.duration * len(self.fade_frames))
+            self.fade_frames[step].blit(self.screen, (self.x, self.y))
         else:
             return False
         return True
@@ -276,7 +346,8 @@ class Button:
         self.hover_progress = 0
         self.active = False
         self.text = text
-        self.font = pygame.font.Font(None, font_size)
+        self.font_size = font_size
+        self.font = fonts.get(None, font_size)
 
     def check_hover(self, hand_keypoints, hover_distance=50):
         any_hand_hovering = False
@@ -288,9 +359,9 @@ class Button:
             if x_diff <= hover_distance and y_diff <= hover_distance:
                 any_hand_hovering = True
                 if self.hover_start_time is None:
-                    self.hover_start_time = pygame.time.get_ticks()
+                    self.hover_start_time = game_clock.frame_time()
 
-                elapsed_time = (pygame.time.get_ticks() - self.hover_start_time) / 1000
+                elapsed_time = game_clock.frame_time() - self.hover_start_time
                 self.hover_progress = min(elapsed_time / self.hover_duration, 1)
 
                 if self.hover_progress >= 1:
@@ -314,7 +385,7 @@ class Button:
         outline_color = (0, 0, 0)
 
         # Draw the inner circle
-        pygame.draw.circle(self.screen, inner_circle_color, (self.x, self.y), self.radius)
+        dirty_rects.add(pygame.draw.circle(self.screen, inner_circle_color, (self.x, self.y), self.radius))
 
         # Draw the outline
         pygame.draw.circle(self.screen, outline_color, (self.x, self.y), self.radius, 5)
@@ -327,9 +398,42 @@ class Button:
 
             pygame.draw.arc(self.screen, outer_circle_color, (self.x - self.radius, self.y - self.radius, 2 * self.radius, 2 * self.radius), math.radians(-90), math.radians(angle - 90), 5)
         if self.text:
-            text_surface = self.font.render(self.text, True, (0, 0, 0))
+            text_surface = text_cache.render(self.text, (0, 0, 0), None, self.font_size)
             text_rect = text_surface.get_rect(center=(self.x, self.y))
-            self.screen.blit(text_surface, text_rect)
-
-
-
+            dirty_rects.add(self.screen.blit(text_surface, text_rect))
+
+
+# Reused instances for the spawn and slice paths; sized for the busiest
+# difficulty level, anything beyond is allocated and counted
+game_item_pool = ObjectPool(GameItem, 64)
+sliced_fruit_pool = ObjectPool(SlicedFruit, 64)
+splash_effect_pool = ObjectPool(SplashEffect, 64)
+
+def preload_assets():
+    # Decode every image and sound used by the game objects up front
+    image_paths = list(GameItem.item_images.values())
+    image_paths += list(GameItem.splash_images.values())
+    for half_paths in GameItem.half_images.values():
+        image_paths += half_paths
+    image_paths += [GameItem.bomb_image_path, GameItem.explosion_image_path, HandKeyPoint.sword_image_path]
+    sound_paths = [GameItem.slice_sound, GameItem.explosion_sound] + SplashEffect.splash_sound_filenames
+    assets.preload(image_paths, sound_paths)
+    # One channel group per kind of effect, each with its own voice cap
+    audio.add_group("slice", 4, [GameItem.slice_sound])
+    audio.add_group("splash", 4, SplashEffect.splash_sound_filenames)
+    audio.add_group("explosion", 2, [GameItem.explosion_sound])
+    audio.init()
+
+
+def build_atlas():
+    # Pack every sprite the render loop draws, at the scale it is drawn at
+    entries = [(path, GameItem.scale_factor) for path in GameItem.item_images.values()]
+    entries += [(path, GameItem.scale_factor) for path in GameItem.splash_images.values()]
+    for half_paths in GameItem.half_images.values():
+        entries += [(path, GameItem.scale_factor) for path in half_paths]
+    entries += [(GameItem.bomb_image_path, GameItem.scale_factor), (GameItem.explosion_image_path, 1)]
+    entries += [(HandKeyPoint.sword_image_path, HandKeyPoint.scale_factor)]
+    pages = atlas.build(dict.fromkeys(entries))
+    for path in dict.fromkeys(GameItem.splash_images.values()):
+        atlas.fade_frames(path, GameItem.scale_factor)
+    return pages
@@ -0,0 +1,155 @@
+import datetime
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    played_at REAL NOT NULL,
+    day TEXT NOT NULL,
+    station TEXT NOT NULL,
+    difficulty REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC);
+CREATE INDEX IF NOT EXISTS scores_by_day ON scores (day, score DESC);
+CREATE INDEX IF NOT EXISTS scores_by_station ON scores (station, score DESC);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def connect(path, timeout=5.0):
+    # WAL lets every station read while one of them writes; writers wait up
+    # to timeout seconds for each other instead of failing
+    connection = sqlite3.connect(path, timeout=timeout)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def day_of(timestamp):
+    return datetime.date.fromtimestamp(timestamp).isoformat()
+
+
+def query_top(connection, limit=5, day=None, station=None):
+    # Best (player, score, played_at, station, difficulty) rows, overall or
+    # for one day and/or station; each filter has its own index
+    conditions, parameters = [], []
+    if day is not None:
+        conditions.append("day = ?")
+        parameters.append(day)
+    if station is not None:
+        conditions.append("station = ?")
+        parameters.append(station)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return connection.execute(
+        f"SELECT player, score, played_at, station, difficulty FROM scores {where} ORDER BY score DESC, played_at LIMIT ?",
+        parameters + [limit],
+    ).fetchall()
+
+
+def import_high_scores(connection, file_name, station):
+    # One-time import of the old high_scores.txt (bare scores, one per line).
+    # The meta row is checked inside the write transaction, so two stations
+    # starting at once cannot both import it.
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        if connection.execute("SELECT 1 FROM meta WHERE key = 'high_scores_imported'").fetchone():
+            connection.rollback()
+            return 0
+        rows = []
+        if os.path.exists(file_name):
+            played_at = os.path.getmtime(file_name)
+            with open(file_name, "r") as file:
+                for line in file:
+                    if line.strip().isdigit():
+                        rows.append(("anonymous", int(line), played_at, day_of(played_at), station, 1.0))
+        connection.executemany("INSERT INTO scores (player, score, played_at, day, station, difficulty) VALUES (?, ?, ?, ?, ?, ?)", rows)
+        connection.execute("INSERT INTO meta (key, value) VALUES ('high_scores_imported', ?)", (str(len(rows)),))
+        connection.commit()
+        return len(rows)
+    except Exception:
+        connection.rollback()
+        raise
+
+
+class Leaderboard:
+    # Scores of every finished game in an SQLite database shared by all the
+    # stations on a machine (or a network share). All disk access happens on
+    # one writer thread: record() only queues the row and merges it into an
+    # in-memory top list, so the game-over screen never waits on the disk.
+    def __init__(self, path="leaderboard.db", station="local", legacy_file="high_scores.txt", top_size=5):
+        self.path = path
+        self.station = station
+        self.legacy_file = legacy_file
+        self.top_size = top_size
+        self.writes = queue.Queue()
+        self.lock = threading.Lock()
+        # (player, score) of the best scores, loaded by the writer thread
+        self.top_scores = []
+        self.thread = None
+        self.error = None
+        self.imported = 0
+        self.written = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self.writer, name="leaderboard", daemon=True)
+        self.thread.start()
+        return self
+
+    def writer(self):
+        try:
+            connection = connect(self.path)
+            self.imported = import_high_scores(connection, self.legacy_file, self.station)
+            if self.imported:
+                print(f"[leaderboard] imported {self.imported} scores from {self.legacy_file}")
+            loaded = [(player, score) for player, score, *_ in query_top(connection, self.top_size)]
+            with self.lock:
+                # Scores recorded before this point are still queued, not in the database
+                self.top_scores = sorted(self.top_scores + loaded, key=lambda row: -row[1])[:self.top_size]
+        except Exception as error:
+            self.error = error
+            print(f"[leaderboard] could not open {self.path}: {error!r}")
+            return
+        while True:
+            row = self.writes.get()
+            if row is None:
+                break
+            try:
+                with connection:
+                    connection.execute("INSERT INTO scores (player, score, played_at, day, station, difficulty) VALUES (?, ?, ?, ?, ?, ?)", row)
+                self.written += 1
+            except sqlite3.Error as error:
+                self.error = error
+                print(f"[leaderboard] could not save a score: {error!r}")
+        connection.close()
+
+    def record(self, player, score, difficulty=1.0):
+        played_at = time.time()
+        self.writes.put((player, int(score), played_at, day_of(played_at), self.station, float(difficulty)))
+        with self.lock:
+            self.top_scores.append((player, int(score)))
+            self.top_scores.sort(key=lambda row: -row[1])
+            del self.top_scores[self.top_size:]
+
+    def top(self):
+        with self.lock:
+            return list(self.top_scores)
+
+    def close(self, timeout=5.0):
+        # Finish the queued writes
+        if self.thread is not None:
+            self.writes.put(None)
+            self.thread.join(timeout)
+            self.thread = None
+
+    def stats(self):
+        return {"path": self.path, "station": self.station, "written": self.written, "pending": self.writes.qsize(), "imported": self.imported}
@@ -0,0 +1,30 @@
+from game_objects.game_item import HandKeyPoint
+from game_objects.text_cache import TextLabel
+from movenet.filters import create_filter
+
+
+class Player:
+    # One tracked person in multiplayer mode: their two blades, score and lives
+    def __init__(self, player_id, x, y, lives=3, font_path=None, font_size=20, wrist_filter=None):
+        self.id = player_id
+        self.left_hand = HandKeyPoint(x, y, motion_filter=create_filter(wrist_filter))
+        self.right_hand = HandKeyPoint(x, y, motion_filter=create_filter(wrist_filter))
+        self.score = 0
+        self.lives = lives
+        self.label = TextLabel(f"P{player_id}: {{}}", (0, 0, 0), font_path, font_size)
+
+    def hands(self):
+        # A blade is not drawn and cannot slice until its wrist has been seen
+        return [hand for hand in (self.left_hand, self.right_hand) if hand.seen()]
+
+    def out(self):
+        return self.lives <= 0
+
+    def update_hands(self, hand_keypoints, screen_width, screen_height, timestamp=None):
+        # Map normalized wrist coordinates from get_hand_keypoints() to the screen
+        for key, (x, y, confidence) in hand_keypoints.items():
+            hand = self.left_hand if key == "left_wrist" else self.right_hand
+            hand.update_position(int(x * screen_width), int(y * screen_height), timestamp, confidence)
+
+    def draw_label(self, screen, position):
+        return self.label.draw(screen, f"{self.score}  Lives: {self.lives}", position)
@@ -0,0 +1,49 @@
+class ObjectPool:
+    # Fixed-capacity free list for a game object class. acquire() resets and
+    # reuses a released instance instead of allocating a new one; pooled
+    # classes implement reset() with the same arguments as __init__.
+    def __init__(self, cls, capacity):
+        self.cls = cls
+        self.capacity = capacity
+        # Blank instances; reset() fills them in on first use
+        self.free = [cls.__new__(cls) for _ in range(capacity)]
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.allocations = 0
+        self.reuses = 0
+        self.discarded = 0
+
+    def acquire(self, *args, **kwargs):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args, **kwargs)
+            self.reuses += 1
+        else:
+            # Pool exhausted: allocate; counted so the capacity can be tuned
+            obj = self.cls(*args, **kwargs)
+            self.allocations += 1
+        self.in_use += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        return obj
+
+    def release(self, obj):
+        self.in_use -= 1
+        if len(self.free) < self.capacity:
+            self.free.append(obj)
+        else:
+            self.discarded += 1
+
+    def release_all(self, objects):
+        for obj in objects:
+            self.release(obj)
+
+    def stats(self):
+        return {
+            "capacity": self.capacity,
+            "in_use": self.in_use,
+            "free": len(self.free),
+            "peak_in_use": self.peak_in_use,
+            "allocations": self.allocations,
+            "reuses": self.reuses,
+            "discarded": self.discarded,
+        }
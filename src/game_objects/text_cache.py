@@ -0,0 +1,72 @@
+import collections
+
+import pygame
+
+
+class FontRegistry:
+    # One shared pygame Font per (file, size); None is pygame's default font
+    def __init__(self):
+        self.fonts = {}
+
+    def get(self, path=None, size=20):
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(path, size)
+            self.fonts[key] = font
+        return font
+
+
+class TextCache:
+    # LRU cache of rendered text surfaces keyed by (font, text, color), so
+    # unchanged labels never go through FreeType again
+    def __init__(self, fonts, max_entries=256):
+        self.fonts = fonts
+        self.max_entries = max_entries
+        self.surfaces = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, color, font_path=None, font_size=20, antialias=True):
+        key = (font_path, font_size, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.fonts.get(font_path, font_size).render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.surfaces)}
+
+
+class TextLabel:
+    # HUD text bound to a value; the surface is only looked up again when the
+    # value changes
+    def __init__(self, template, color=(0, 0, 0), font_path=None, font_size=20):
+        self.template = template
+        self.color = color
+        self.font_path = font_path
+        self.font_size = font_size
+        self.value = None
+        self.surface = None
+
+    def update(self, value):
+        if self.surface is None or value != self.value:
+            self.value = value
+            self.surface = text_cache.render(self.template.format(value), self.color, self.font_path, self.font_size)
+        return self.surface
+
+    def draw(self, screen, value, position):
+        return screen.blit(self.update(value), position)
+
+
+# Shared registries used by the HUD, buttons and menus
+fonts = FontRegistry()
+text_cache = TextCache(fonts)
@@ -0,0 +1,29 @@
+import argparse
+
+from movenet.backends import BACKENDS
+from movenet.movenet_utils import load_model, warm_up
+from movenet.inference_server import InferenceServer
+
+# Shared pose model for several game instances on one machine:
+#   python src/inference_server.py --backend lightning --socket /tmp/slicefrenzy.sock
+#   python src/main.py --inference-server /tmp/slicefrenzy.sock
+parser = argparse.ArgumentParser(description="SliceFrenzy: pose inference server for multi-station setups")
+parser.add_argument("--socket", default="/tmp/slicefrenzy-pose.sock", help="Unix socket path the game processes connect to")
+parser.add_argument("--backend", choices=sorted(BACKENDS), default="lightning", help="pose model engine")
+parser.add_argument("--model-path", default=None, help="local model file or SavedModel directory")
+parser.add_argument("--num-threads", type=int, default=None, help="inference threads for the tflite and onnx backends")
+parser.add_argument("--max-batch", type=int, default=8, help="most frames run in one batch")
+parser.add_argument("--max-wait-ms", type=float, default=4.0, help="longest a frame waits for others to join its batch")
+parser.add_argument("--stats-interval", type=float, default=10.0, help="seconds between printed batch and queue statistics")
+args = parser.parse_args()
+
+model = load_model(args.backend, args.model_path, args.num_threads)
+warm_up(model)
+server = InferenceServer(model, args.socket, args.max_batch, args.max_wait_ms, args.stats_interval)
+try:
+    server.serve_forever()
+except KeyboardInterrupt:
+    pass
+finally:
+    print(f"[server] {server.stats()}")
+    server.close()
@@ -1,21 +1,40 @@
+import time
+startup_time = time.perf_counter()
+import argparse
+import socket
+import functools
+import os
 import pygame
 import cv2
-from movenet.movenet_utils import load_model, preprocess_image, run_inference, get_hand_keypoints
-from game_objects.game_item import GameItem, HandKeyPoint, Button
+from movenet.movenet_utils import ModelLoader, run_inference, get_hand_keypoints, get_people
+from movenet.preprocessing import FramePreprocessor
+from movenet.pipeline import PosePipeline
+from movenet.backends import BACKENDS
+from movenet.roi import RoiTracker
+from movenet.person_tracker import PersonTracker
+from movenet.filters import FILTERS, create_filter
+from movenet.motion_gate import MotionGate
+from capture.frame_sources import open_frame_source, KeypointRecorder, TRACE_EXTENSIONS
+from capture.shared_frames import CaptureProcess
+from game_objects.game_item import GameItem, HandKeyPoint, Button, preload_assets, build_atlas, game_item_pool, sliced_fruit_pool, splash_effect_pool
+from game_objects.assets import assets
+from game_objects.audio import audio
+from game_objects.entity_store import EntityStore, ITEM, HALF
+from game_objects.blade import sweep_segments, nearest_segments
+from game_objects.player import Player
+from game_objects.dirty_rects import DirtyRectRenderer, dirty_rects
+from game_objects.text_cache import fonts, text_cache, TextLabel
+from game_objects.game_clock import game_clock
+from game_objects.leaderboard import Leaderboard
+from perf.startup import StartupTimer
+from perf.profiler import FrameProfiler
+from perf.hud import PerformanceHud
+from perf.governor import QualityGovernor, QUALITY_TIERS
 import sys
 
-def save_high_scores(high_scores, file_name="high_scores.txt"):
-    with open(file_name, "w") as file:
-        for score in high_scores:
-            file.write(f"{score}\n")
-def load_high_scores(file_name="high_scores.txt"):
-    try:
-        with open(file_name, "r") as file:
-            scores = [int(line.strip()) for line in file.readlines()]
-    except FileNotFoundError:
-        scores = []
-
-    return scores
+startup = StartupTimer(startup_time)
+startup.mark("imports")
+
 def display_high_scores(screen, high_scores, font, color=(255, 255, 255)):
     x = screen.get_width() // 2
     y = screen.get_height() // 4
@@ -24,24 +43,117 @@ def display_high_scores(screen, high_scores, font, color=(255, 255, 255)):
     title_rect = title_text.get_rect(center=(x, y))
     screen.blit(title_text, title_rect)
 
-    for i, score in enumerate(high_scores, 1):
+    for i, (player, score) in enumerate(high_scores, 1):
         y += font.get_height() * 1.5
-        score_text = font.render(f"{i}. {score}", True, color)
+        score_text = font.render(f"{i}. {player} {score}", True, color)
         score_rect = score_text.get_rect(center=(x, y))
         screen.blit(score_text, score_rect)
 
+parser = argparse.ArgumentParser(description="SliceFrenzy: webcam fruit slicing game")
+parser.add_argument("--backend", choices=sorted(BACKENDS), default="thunder", help="pose model engine (lightning/tflite are much faster on CPU-only machines)")
+parser.add_argument("--model-path", default=None, help="local model file or SavedModel directory (defaults to the backend's file under models/)")
+parser.add_argument("--num-threads", type=int, default=None, help="inference threads for the tflite and onnx backends")
+parser.add_argument("--inference-server", default=None, metavar="SOCKET", help="send frames to a shared inference server (src/inference_server.py) instead of loading a model")
+parser.add_argument("--roi", action="store_true", help="crop the model input around the player found in the previous frame")
+parser.add_argument("--pipeline", action="store_true", help="run capture, preprocessing and inference on background threads")
+parser.add_argument("--queue-size", type=int, default=1, help="depth of the drop-oldest queues between pipeline stages")
+parser.add_argument("--motion-gate", action="store_true", help="skip pose inference and reuse the last keypoints while the camera image is static")
+parser.add_argument("--motion-threshold", type=float, default=0.01, help="fraction of changed pixels that counts as motion for --motion-gate")
+parser.add_argument("--motion-refresh-hz", type=float, default=2.0, help="minimum pose inference rate with --motion-gate, even without motion")
+parser.add_argument("--motion-wrist-roi", action="store_true", help="with --motion-gate, only look for motion around the last seen wrists")
+parser.add_argument("--multiplayer", action="store_true", help="track everyone in view with their own blades, score and lives (use with --backend multipose)")
+parser.add_argument("--max-players", type=int, default=6, help="most people tracked at once in multiplayer mode")
+parser.add_argument("--wrist-filter", choices=["none"] + sorted(FILTERS), default=None, help="smooth wrists and extrapolate them to the render time between pose results")
+parser.add_argument("--adaptive-quality", action="store_true", help="step through quality tiers (model, inference rate, particle caps, dirty rects) to hold --target-fps")
+parser.add_argument("--target-fps", type=float, default=30, help="frame rate the adaptive quality governor aims for")
+parser.add_argument("--vectorized", action="store_true", help="keep items and halves in NumPy arrays and update them in batches")
+parser.add_argument("--spawn-count", type=int, default=1, help="items launched per spawn tick (stress testing)")
+parser.add_argument("--dirty-rects", action="store_true", help="redraw and push only the screen regions that changed instead of flipping the whole frame")
+parser.add_argument("--perf-hud", action="store_true", help="show the performance overlay from the start (toggle with F3)")
+parser.add_argument("--profile-csv", default=None, metavar="PATH", help="write per-frame stage timings to a CSV file at exit")
+parser.add_argument("--profile-trace", default=None, metavar="PATH", help="write a Chrome trace (chrome://tracing, Perfetto) of every frame at exit")
+parser.add_argument("--source", default="0", help="camera index, video file, image directory/glob, or a .jsonl/.npz keypoint trace to replay")
+parser.add_argument("--capture-process", choices=["frames", "infer"], default=None, help="capture frames (and with 'infer' also run the pose model) in a separate process, sharing results through shared memory")
+parser.add_argument("--loop", action="store_true", help="restart file sources when they reach the end")
+parser.add_argument("--record-keypoints", default=None, metavar="PATH", help="save every inference result to a .jsonl or .npz trace for replay")
+parser.add_argument("--leaderboard", default="leaderboard.db", metavar="PATH", help="SQLite leaderboard shared by every station (old high_scores.txt scores are imported once)")
+parser.add_argument("--station", default=socket.gethostname(), help="station name stored with each score")
+parser.add_argument("--player-name", default="Player", help="name stored with single-player scores")
+parser.add_argument("--seed", type=int, default=None, help="seed the random spawns for reproducible sessions")
+parser.add_argument("--headless", action="store_true", help="use the SDL dummy video and audio drivers (no window or sound card needed)")
+parser.add_argument("--skip-tutorial", action="store_true", help="start playing immediately")
+parser.add_argument("--max-frames", type=int, default=None, help="quit after this many frames")
+parser.add_argument("--max-fps", type=int, default=200, help="frame-rate cap (0 for none, e.g. when benchmarking)")
+args = parser.parse_args()
+if args.adaptive_quality and args.wrist_filter is None:
+    # Frames without a fresh inference are filled in by wrist prediction
+    args.wrist_filter = "one-euro"
+if args.roi and (args.multiplayer or args.backend == "multipose"):
+    parser.error("--roi crops around a single person and cannot be combined with --multiplayer or --backend multipose")
+if args.capture_process == "infer" and (args.roi or args.inference_server or args.motion_gate):
+    parser.error("--capture-process infer runs its own model and cannot be combined with --roi, --inference-server or --motion-gate")
+
+if args.headless:
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+
 import random
+if args.seed is not None:
+    random.seed(args.seed)
 sliced_fruits = []
 
 active_splash_effects = []
 
-# Initialize the MoveNet model
-movenet_model = load_model()
+# Open the frame source first so a keypoint trace can skip the model entirely
+if args.capture_process and not args.source.endswith(TRACE_EXTENSIONS):
+    # Capture (and maybe inference) move to their own process, forked before
+    # pygame and the model loader thread start
+    cap = CaptureProcess(args.source, args.loop, infer=args.capture_process == "infer", backend=args.backend, model_path=args.model_path, num_threads=args.num_threads).start()
+else:
+    cap = open_frame_source(args.source, loop=args.loop)
+
+# Recorded sources replay one simulation step per frame, so runs with the
+# same --seed match; live cameras and the threaded capture paths (which drop
+# frames) run on the wall clock
+game_clock.frame_locked = cap.keypoints_only or (not args.source.isdigit() and not args.pipeline and not args.capture_process)
+
+# Scores are saved on the leaderboard's own thread (started after the
+# capture process is forked)
+leaderboard = Leaderboard(args.leaderboard, args.station).start()
+
+# Import TensorFlow, load and warm up the MoveNet model in the background so
+# the window opens straight away
+model_loader = None
+if not cap.keypoints_only and not cap.runs_inference:
+    model_loader = ModelLoader(args.backend, args.model_path, args.num_threads, args.inference_server).start()
+movenet_model = None
+preprocess_frame = None
+run_pose_inference = run_inference
+mirror_frames = True
+roi_tracker = None
+# Skips inference on static camera frames; keypoints are always mirrored
+# relative to the camera frame the gate sees
+motion_gate = None
+if args.motion_gate and not cap.keypoints_only:
+    motion_gate = MotionGate(args.motion_threshold, min_refresh_hz=args.motion_refresh_hz, wrist_roi=args.motion_wrist_roi)
+last_pose_result = None
 
 # Initialize the webcam feed
-cap = cv2.VideoCapture(0)
-webcam_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)*1.5)
-webcam_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)*1.5)
+webcam_width = int(cap.width*1.5)
+webcam_height = int(cap.height*1.5)
+startup.mark("camera open")
+
+keypoint_recorder = None
+if args.record_keypoints:
+    keypoint_recorder = KeypointRecorder(args.record_keypoints, (cap.width, cap.height))
+
+# In pipeline mode the camera and the model run on worker threads and the
+# render loop only picks up the most recent keypoints
+pose_pipeline = None
+last_pose_timestamp = None
+if cap.runs_inference:
+    # The capture process publishes keypoints the same way
+    pose_pipeline = cap
 
 # Initialize pygame and create game window
 pygame.init()
@@ -50,39 +162,128 @@ screen_height = int(webcam_height)
 screen = pygame.display.set_mode((screen_width, screen_height))
 
 pygame.display.set_caption("Fruit Ninja Game")
+startup.mark("window")
 
 # Load assets
 font_path = "assets/fonts/custom_font.ttf"
 font_size = 36
-custom_font = pygame.font.Font(font_path, font_size)
+custom_font = fonts.get(font_path, font_size)
+
+# Score and lives are only re-rasterized when their values change
+score_label = TextLabel("Score: {}", (0, 0, 0), font_path, font_size)
+lives_label = TextLabel("Lives: {}", (0, 0, 0), font_path, font_size)
 
 bg_music_path = "assets/sounds/background_music.mp3"
-pygame.mixer.music.load(bg_music_path)
-pygame.mixer.music.set_volume(0.5)
-pygame.mixer.music.play(-1)
+if os.path.exists(bg_music_path):
+    pygame.mixer.music.load(bg_music_path)
+    pygame.mixer.music.set_volume(0.5)
+    pygame.mixer.music.play(-1)
 
 # Load background image
 bg_image_path = "assets/images/background.png"
 bg_image = pygame.image.load(bg_image_path)
-bg_image = pygame.transform.scale(bg_image, (screen_width, screen_height))
+bg_image = pygame.transform.scale(bg_image, (screen_width, screen_height)).convert()
+
+# Decode all sprites and sound effects once so spawning and slicing do no disk I/O
+preload_assets()
+build_atlas()
+startup.mark("assets")
 
 # Game settings and variables
 clock = pygame.time.Clock()
-FPS = 200
+FPS = args.max_fps
 score = 0
 lives = 3
+# Spawn interval in milliseconds; spawning and the difficulty ramp run on
+# simulation time (game_clock), so they stop while the game is paused
 game_item_timer = 2000
-game_item_event = pygame.USEREVENT + 1
-pygame.time.set_timer(game_item_event, game_item_timer)
+next_spawn_time = game_clock.time + game_item_timer / 1000
+difficulty_timer = game_clock.time
 
 game_items = []
 
+# In vectorized mode items and halves live in a structure-of-arrays store
+# instead of game_items / sliced_fruits
+entity_store = None
+if args.vectorized:
+    entity_store = EntityStore(screen, screen_width, screen_height)
+
+# In dirty-rect mode only the regions drawn this frame or last frame are
+# restored from the background and pushed to the display
+dirty_renderer = None
+if args.dirty_rects:
+    dirty_renderer = DirtyRectRenderer(screen, bg_image)
+
+# Per-stage frame timings and the F3 performance overlay
+profiler = FrameProfiler(keep_frames=bool(args.profile_csv or args.profile_trace))
+perf_hud = PerformanceHud(profiler, visible=args.perf_hud)
+
+def render_splash_effects():
+    # Render active splashes; finished ones go back to the pool and the list
+    # is compacted in place
+    kept = 0
+    for splash_effect in active_splash_effects:
+        if splash_effect.render():
+            active_splash_effects[kept] = splash_effect
+            kept += 1
+        else:
+            splash_effect_pool.release(splash_effect)
+    del active_splash_effects[kept:]
+
 def draw_hand_keypoints(screen, hand_keypoints):
     for keypoint in hand_keypoints:
         keypoint.draw(screen)
 
-left_hand_keypoint = HandKeyPoint(screen_width // 2, screen_height // 2)
-right_hand_keypoint = HandKeyPoint(screen_width // 2, screen_height // 2)
+left_hand_keypoint = HandKeyPoint(screen_width // 2, screen_height // 2, motion_filter=create_filter(args.wrist_filter))
+right_hand_keypoint = HandKeyPoint(screen_width // 2, screen_height // 2, motion_filter=create_filter(args.wrist_filter))
+
+# In multiplayer mode every tracked person gets a Player, keyed by track id
+person_tracker = None
+players = {}
+if args.multiplayer:
+    person_tracker = PersonTracker(max_people=args.max_players)
+
+def update_players(keypoints_with_scores, timestamp):
+    for track in person_tracker.update(get_people(keypoints_with_scores)):
+        player = players.get(track.id)
+        if player is None:
+            player = Player(track.id, screen_width // 2, screen_height // 2, font_path=font_path, font_size=font_size, wrist_filter=args.wrist_filter)
+            players[track.id] = player
+            print(f"Player {track.id} joined")
+        player.update_hands(get_hand_keypoints(track.keypoints.reshape(1, 1, 17, 3)), screen_width, screen_height, timestamp)
+    for track_id in person_tracker.dropped:
+        if players.pop(track_id, None) is not None:
+            print(f"Player {track_id} left")
+
+def blade_hands():
+    # Hands that can slice this frame, and the player owning each (None in
+    # single-player mode)
+    if person_tracker is None:
+        hands = [hand for hand in (left_hand_keypoint, right_hand_keypoint) if hand.seen()]
+        return hands, [None] * len(hands)
+    hands, owners = [], []
+    for player in players.values():
+        if not player.out():
+            player_hands = player.hands()
+            hands.extend(player_hands)
+            owners.extend([player] * len(player_hands))
+    return hands, owners
+
+def credit_hit(result, player):
+    # Apply a slice to the shared score and, in multiplayer mode, to the
+    # player whose blade made it
+    global score, lives
+    if result == "fruit":
+        score += 1
+        if player is not None:
+            player.score += 1
+    elif result == "bomb":
+        if player is None:
+            lives -= 1
+        else:
+            player.lives -= 1
+            # Game over once everyone in view is out
+            lives = max(other.lives for other in players.values())
 
 game_paused = False
 
@@ -98,181 +299,487 @@ screen_center_y = screen_height // 2
 pause_button = Button((screen_center_x*2)-150, (screen_center_y//2)-60, pause_button_radius, screen, action=pause_game, text="Pause",font_size=30)
 
 def restart_game():
-    global game_paused, score, lives, game_items, active_splash_effects, sliced_fruits,difficulty_multiplier, game_item_timer, game_item_event, difficulty_timer
+    global game_paused, score, lives, game_item_timer, next_spawn_time, difficulty_timer
 
     # Reset game state
     score = 0
     lives = 3
-    game_items = []
-    active_splash_effects = []
-    sliced_fruits = []
+    if person_tracker is not None:
+        person_tracker.clear()
+        players.clear()
+    game_item_pool.release_all(game_items)
+    game_items.clear()
+    splash_effect_pool.release_all(active_splash_effects)
+    active_splash_effects.clear()
+    sliced_fruit_pool.release_all(sliced_fruits)
+    sliced_fruits.clear()
+    if entity_store is not None:
+        entity_store.clear()
+    if dirty_renderer is not None:
+        # Repaint the whole screen so nothing from the last game is left on it
+        dirty_renderer.invalidate()
     GameItem.difficulty_multiplier = 1
     game_item_timer = 2000
-    game_item_event = pygame.USEREVENT + 1
-    pygame.time.set_timer(game_item_event, game_item_timer)
+    next_spawn_time = game_clock.time + game_item_timer / 1000
+    difficulty_timer = game_clock.time
 
     game_paused = False
 
 restart_button_radius = 30
 restart_button = Button(screen_width // 2, screen_height // 2 + 50, restart_button_radius, screen, action=restart_game, text="Restart")
 
-left_tutorial_done = False
-right_tutorial_done = False
+left_tutorial_done = args.skip_tutorial
+right_tutorial_done = args.skip_tutorial
 left_tutorial_button = Button(screen_center_x - 100, screen_center_y, 60, screen, action=lambda: setattr(sys.modules[__name__], 'left_tutorial_done', True), hover_duration=5, text="Left Hand")
 right_tutorial_button = Button(screen_center_x + 100, screen_center_y, 60, screen, action=lambda: setattr(sys.modules[__name__], 'right_tutorial_done', True), hover_duration=5, text="Right Hand")
-tutorial_done = False
+tutorial_done = args.skip_tutorial
+
+def draw_loading_screen():
+    # Background, tutorial buttons and an animated indicator while the model loads
+    screen.blit(bg_image, (0, 0))
+    left_tutorial_button.draw()
+    right_tutorial_button.draw()
+    dots = "." * (pygame.time.get_ticks() // 400 % 4)
+    loading_text = text_cache.render(f"Loading pose model{dots}", (0, 0, 0), font_path, font_size)
+    screen.blit(loading_text, loading_text.get_rect(center=(screen_center_x, screen_center_y + 120)))
+
+def use_pose_model(model):
+    # Set up preprocessing, inference and the pipeline for a loaded pose model.
+    # Called again when the quality governor swaps the model variant.
+    global movenet_model, preprocess_frame, run_pose_inference, mirror_frames, roi_tracker, pose_pipeline
+    movenet_model = model
+    # Letterbox straight into reused input buffers; keypoints are
+    # mirrored afterwards instead of flipping every frame
+    frame_preprocessor = FramePreprocessor(movenet_model.input_size, movenet_model.input_dtype, buffers=args.queue_size + 2)
+    preprocess_frame = frame_preprocessor.preprocess
+    run_pose_inference = frame_preprocessor.run_inference
+    mirror_frames = False
+    if args.roi:
+        # Feed only a crop around the player, tracked from the previous keypoints
+        if roi_tracker is None:
+            roi_tracker = RoiTracker()
+        preprocess_frame = functools.partial(roi_tracker.preprocess, input_size=movenet_model.input_size)
+        run_pose_inference = roi_tracker.run_inference
+        mirror_frames = True
+    if args.pipeline:
+        if pose_pipeline is not None:
+            pose_pipeline.stop()
+        pose_pipeline = PosePipeline(cap, movenet_model, preprocess_frame, run_pose_inference, queue_size=args.queue_size, mirror=mirror_frames, motion_gate=motion_gate).start()
+
+def pose_backend_for(tier):
+    # Only thunder has a lighter variant to fall back to; MultiPose players
+    # and a shared inference server keep their model
+    if tier.backend is None or args.backend != "thunder" or args.multiplayer or args.inference_server or not backend_swaps_enabled:
+        return args.backend
+    return tier.backend
+
+def apply_quality_tier(tier):
+    global quality_tier, pose_backend, model_swap_loader, dirty_renderer
+    quality_tier = tier
+    if entity_store is not None:
+        entity_store.max_halves = tier.max_halves
+
+    if model_loader is not None:
+        backend = pose_backend_for(tier)
+        if backend != pose_backend:
+            pose_backend = backend
+            if backend in pose_models:
+                use_pose_model(pose_models[backend])
+                model_swap_loader = None
+            else:
+                # Load the lighter model in the background and swap once it is warm
+                model_swap_loader = ModelLoader(backend, None, args.num_threads).start()
+
+    if not args.dirty_rects:
+        if tier.dirty_rects and dirty_renderer is None:
+            dirty_renderer = DirtyRectRenderer(screen, bg_image)
+        elif not tier.dirty_rects and dirty_renderer is not None:
+            dirty_renderer = None
+            dirty_rects.enabled = False
+            dirty_rects.take()
+
+def add_splash_effect(splash_effect):
+    # Over the tier's cap the oldest splash makes room for the new one
+    if quality_tier.max_splashes is not None and len(active_splash_effects) >= quality_tier.max_splashes:
+        splash_effect_pool.release(active_splash_effects.pop(0))
+    active_splash_effects.append(splash_effect)
+
+# Loaded pose models by backend name, so switching tiers back is instant
+pose_models = {}
+pose_backend = args.backend
+model_swap_loader = None
+backend_swaps_enabled = True
+quality_tier = QUALITY_TIERS[0]
+quality_governor = None
+if args.adaptive_quality:
+    quality_governor = QualityGovernor(args.target_fps)
 
-difficulty_timer = pygame.time.get_ticks()
 # Main game loop
 running = True
+first_frame_drawn = False
+frame_count = 0
 while running:
-    if tutorial_done and not game_paused:
-        # Increase difficulty every 5 seconds
-        if pygame.time.get_ticks() - difficulty_timer >= 4000:
+    if model_loader is not None and movenet_model is None:
+        if model_loader.ready():
+            if model_loader.error is not None:
+                raise model_loader.error
+            for phase, seconds in model_loader.timings.items():
+                startup.add(phase, seconds)
+            pose_models[args.backend] = model_loader.model
+            use_pose_model(model_loader.model)
+            startup.mark("model ready")
+        else:
+            # Keep the window responsive until the pose model is ready
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+            draw_loading_screen()
+            pygame.display.flip()
+            if not first_frame_drawn:
+                startup.mark("first frame")
+                first_frame_drawn = True
+            clock.tick(30)
+            continue
+
+    if model_swap_loader is not None and model_swap_loader.ready():
+        if model_swap_loader.error is not None:
+            print(f"[quality] could not load the {model_swap_loader.backend} model, keeping {args.backend}: {model_swap_loader.error!r}")
+            backend_swaps_enabled = False
+            pose_backend = args.backend
+        else:
+            pose_models[model_swap_loader.backend] = model_swap_loader.model
+            use_pose_model(model_swap_loader.model)
+            print(f"[quality] switched pose model to {model_swap_loader.backend}")
+        model_swap_loader = None
+
+    profiler.begin_frame()
+    # Fixed-timestep simulation: the difficulty ramp, spawning and physics
+    # run in whole game_clock steps however fast frames are rendered, and
+    # items are drawn interpolated between the last two steps
+    for _ in range(game_clock.advance(tutorial_done and not game_paused)):
+        # Increase difficulty every 4 seconds
+        if game_clock.time - difficulty_timer >= 4:
             GameItem.difficulty_multiplier += 0.03
             # Cap on difficulty
             GameItem.difficulty_multiplier = min(GameItem.difficulty_multiplier, 1.7)
-            
-            # Decrease game_item_timer, with a lower cap
-            game_item_timer = max(game_item_timer - 100, 500)
 
-            # Reset game_item_event timer
-            pygame.time.set_timer(game_item_event, game_item_timer)
+            # Decrease game_item_timer, with a lower cap, and restart the spawn countdown
+            game_item_timer = max(game_item_timer - 100, 500)
+            next_spawn_time = game_clock.time + game_item_timer / 1000
             print(f"Difficulty increased to {GameItem.difficulty_multiplier}x")
-            difficulty_timer = pygame.time.get_ticks()
+            difficulty_timer = game_clock.time
+
+        if game_clock.time >= next_spawn_time:
+            # Randomly generate game items (fruits or bombs)
+            for _ in range(args.spawn_count):
+                item_type = random.choices(["apple", "banana", "coconut", "orange", "pineapple", "watermelon", "bomb"], weights=[10, 10, 10, 10, 10, 10, 10*GameItem.difficulty_multiplier], k=1)[0]
+                if entity_store is not None:
+                    entity_store.spawn_item(item_type, GameItem.difficulty_multiplier)
+                else:
+                    game_item = game_item_pool.acquire(screen, screen_width, screen_height, item_type, GameItem.difficulty_multiplier)
+                    game_items.append(game_item)
+            next_spawn_time += game_item_timer / 1000
+
+        if entity_store is not None:
+            # Batched physics over every live item and half
+            entity_store.update_positions()
+        else:
+            for game_item in game_items:
+                game_item.update_position()
+            for sliced_fruit in sliced_fruits:
+                sliced_fruit.update_position(screen_height)
+        game_clock.tick()
+    alpha = game_clock.alpha
+    profiler.lap("physics")
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
-        if tutorial_done and not game_paused and event.type == game_item_event:
-            # Randomly generate game items (fruits or bombs)
-            item_type = random.choices(["apple", "banana", "coconut", "orange", "pineapple", "watermelon", "bomb"], weights=[10, 10, 10, 10, 10, 10, 10*GameItem.difficulty_multiplier], k=1)[0]
-            game_item = GameItem(screen, screen_width, screen_height, item_type, GameItem.difficulty_multiplier)
-            game_items.append(game_item)
-
-    # Capture webcam frame and run MoveNet inference
-    ret, frame = cap.read()
-    if not ret:
-        break
-    frame = cv2.flip(frame, 1)
-
-    # Preprocess the frame and run inference
-    input_image = preprocess_image(frame)
-    keypoints_with_scores = run_inference(movenet_model, input_image)
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            perf_hud.toggle()
+    profiler.lap("events")
+
+    # New model output this frame, if any, and when its frame was captured
+    pose_result = None
+    pose_timestamp = game_clock.frame_time()
+    inference_ms = None
+    if cap.keypoints_only:
+        # Replay a recorded keypoint trace, no camera or inference
+        pose_result = cap.read_keypoints()
+        if pose_result is None:
+            break
+        profiler.lap("capture")
+    elif pose_pipeline is not None:
+        if pose_pipeline.finished:
+            break
+        # Only move the hands when the pipeline has produced a new result
+        latest_pose = pose_pipeline.latest()
+        profiler.lap("pose_poll")
+        if latest_pose is not None and latest_pose[1] != last_pose_timestamp:
+            pose_result, last_pose_timestamp = latest_pose
+            pose_timestamp = last_pose_timestamp
+            inference_ms = pose_pipeline.last_inference_ms()
+            if keypoint_recorder is not None:
+                keypoint_recorder.record(pose_result)
+    else:
+        # Capture webcam frame and run MoveNet inference
+        ret, frame = cap.read()
+        if not ret:
+            break
+        profiler.lap("capture")
+        # Lower quality tiers only run the model on every Nth frame; the
+        # wrist filter predicts the hands in between
+        if frame_count % quality_tier.infer_every == 0:
+            moved = True
+            if motion_gate is not None:
+                moved = motion_gate.should_infer(frame, pose_timestamp)
+                profiler.lap("motion_gate")
+            if not moved:
+                # Nothing moved since the last inference: reuse its keypoints
+                pose_result = last_pose_result
+            else:
+                if mirror_frames:
+                    frame = cv2.flip(frame, 1)
+                    profiler.lap("flip")
+
+                # Preprocess the frame and run inference
+                input_image = preprocess_frame(frame)
+                profiler.lap("preprocess")
+                pose_result = run_pose_inference(movenet_model, input_image)
+                profiler.lap("inference")
+                inference_ms = profiler.current["inference"]
+                last_pose_result = pose_result
+                if motion_gate is not None:
+                    motion_gate.record_inference(pose_result, profiler.current["preprocess"] + inference_ms)
+                if keypoint_recorder is not None:
+                    keypoint_recorder.record(pose_result)
 
     # Get hand keypoint coordinates
-    hand_keypoints = get_hand_keypoints(keypoints_with_scores)
+    hand_keypoints = {}
+    if pose_result is not None:
+        if person_tracker is not None:
+            update_players(pose_result, pose_timestamp)
+        else:
+            hand_keypoints = get_hand_keypoints(pose_result)
 
     # Map hand keypoint coordinates to game screen coordinates
     screen_hand_keypoints = {}
     for key, point in hand_keypoints.items():
-        y, x = point
-        screen_x = int(y * screen_width)
-        screen_y = int(x * screen_height)
+        x, y, confidence = point
+        screen_x = int(x * screen_width)
+        screen_y = int(y * screen_height)
         screen_hand_keypoints[key] = (screen_x, screen_y)
         if key == "left_wrist":
-            left_hand_keypoint.update_position(screen_x, screen_y)
+            left_hand_keypoint.update_position(screen_x, screen_y, pose_timestamp, confidence)
         elif key == "right_wrist":
-            right_hand_keypoint.update_position(screen_x, screen_y)
-
+            right_hand_keypoint.update_position(screen_x, screen_y, pose_timestamp, confidence)
+
+    # Segments swept by each wrist since the last frame, so fast swipes between
+    # two inference results still hit the fruit they crossed. In multiplayer
+    # mode every player's wrists go into the same batch and blade_owners maps
+    # each segment back to its hand.
+    hands, hand_players = blade_hands()
+    # With --wrist-filter the blades are drawn where the wrists should be now,
+    # not where they were when the last pose result's frame was captured
+    render_timestamp = game_clock.frame_time()
+    for hand in hands:
+        hand.extrapolate(render_timestamp)
+    blade_starts, blade_ends, blade_owners = sweep_segments(hands)
+    profiler.lap("hand_keypoints")
 
     # Clear the screen
-    screen.blit(bg_image, (0, 0))
+    if dirty_renderer is not None:
+        dirty_renderer.begin_frame()
+    else:
+        screen.blit(bg_image, (0, 0))
     if not tutorial_done:
-        left_tutorial_button.check_hover([left_hand_keypoint, right_hand_keypoint])
+        left_tutorial_button.check_hover(hands)
         left_tutorial_button.draw()
 
-        right_tutorial_button.check_hover([left_hand_keypoint, right_hand_keypoint])
+        right_tutorial_button.check_hover(hands)
         right_tutorial_button.draw()
 
         if left_tutorial_done and right_tutorial_done:
             left_tutorial_button.reset()
             right_tutorial_button.reset()
             tutorial_done = True
+    profiler.lap("render")
 
     if tutorial_done:
-        pause_button.check_hover([left_hand_keypoint, right_hand_keypoint])
+        pause_button.check_hover(hands)
         pause_button.draw()
 
         if game_paused:
-            restart_button.check_hover([left_hand_keypoint, right_hand_keypoint])
+            restart_button.check_hover(hands)
             restart_button.draw()
 
         if not game_paused:
-            new_game_items = []
-            for game_item in game_items:
-                game_item.update_position()
-                game_item.render()
-
-                # Check for collision between hand keypoints and the game item
-                if game_item.check_collision([left_hand_keypoint, right_hand_keypoint]):
-                    result, sliced, splash_effect = game_item.apply_effect()
-
+            if entity_store is not None:
+                # Batched collisions over every live item
+                entity_store.render(ITEM, alpha)
+                profiler.lap("render")
+                hit_indices, hit_segments = entity_store.check_collisions(blade_starts, blade_ends, alpha=alpha)
+                for index, segment in zip(hit_indices.tolist(), hit_segments.tolist()):
+                    result, sliced, splash_effect = entity_store.apply_effect(index)
                     if result == "fruit":
-                        active_splash_effects.append(splash_effect)
-                        score += 1
-                        if sliced:
-                            sliced_fruits.append(sliced)
-                    elif result == "bomb":
-                        lives -= 1
-                else:
-                    if not game_item.out_of_bounds():
-                        new_game_items.append(game_item)
-
-            game_items = new_game_items
-            new_active_splash_effects = []
-            for splash_effect in active_splash_effects:
-                should_keep = splash_effect.render()
-                if should_keep:
-                    new_active_splash_effects.append(splash_effect)
-            active_splash_effects = new_active_splash_effects
-
-            # Update and render sliced fruits
-            new_sliced_fruits = []
-            for sliced_fruit in sliced_fruits:
-                sliced_fruit.update_position(screen_height)
-                sliced_fruit.render()
-
-                if not sliced_fruit.out_of_bounds(screen_height):
-                    new_sliced_fruits.append(sliced_fruit)
-            sliced_fruits = new_sliced_fruits
-                # Display the score and lives
-            score_text = custom_font.render(f"Score: {score}", 1, (0, 0, 0))
-            screen.blit(score_text, (10, 10))
-            lives_text = custom_font.render(f"Lives: {lives}", 1, (0, 0, 0))
-            screen.blit(lives_text, (screen_width - 200, 10))
+                        add_splash_effect(splash_effect)
+                    credit_hit(result, hand_players[blade_owners[segment]])
+                entity_store.remove_out_of_bounds()
+                entity_store.compact()
+                profiler.lap("physics")
+
+                render_splash_effects()
+                entity_store.render(HALF, alpha)
+
+            else:
+                # Check for collisions between the blade sweeps and all game items at once,
+                # where the items are drawn this frame
+                hit_segments = nearest_segments([game_item.center(alpha) for game_item in game_items], blade_starts, blade_ends)
+                profiler.lap("physics")
+                kept = 0
+                for game_item, segment in zip(game_items, hit_segments.tolist()):
+                    game_item.render(alpha)
+
+                    if segment >= 0:
+                        result, sliced, splash_effect = game_item.apply_effect()
+
+                        if result == "fruit":
+                            add_splash_effect(splash_effect)
+                            if sliced:
+                                if quality_tier.max_halves is not None and 2 * len(sliced_fruits) >= quality_tier.max_halves:
+                                    sliced_fruit_pool.release(sliced)
+                                else:
+                                    sliced_fruits.append(sliced)
+                        credit_hit(result, hand_players[blade_owners[segment]])
+                        game_item_pool.release(game_item)
+                    elif game_item.out_of_bounds():
+                        game_item_pool.release(game_item)
+                    else:
+                        # Compact the surviving items in place
+                        game_items[kept] = game_item
+                        kept += 1
+                del game_items[kept:]
+
+                render_splash_effects()
+
+                # Render sliced fruits
+                kept = 0
+                for sliced_fruit in sliced_fruits:
+                    sliced_fruit.render(alpha)
+
+                    if sliced_fruit.out_of_bounds(screen_height):
+                        sliced_fruit_pool.release(sliced_fruit)
+                    else:
+                        sliced_fruits[kept] = sliced_fruit
+                        kept += 1
+                del sliced_fruits[kept:]
+
+            profiler.lap("render")
+
+            # Display the score and lives
+            dirty_rects.add(score_label.draw(screen, score, (10, 10)))
+            if person_tracker is None:
+                dirty_rects.add(lives_label.draw(screen, lives, (screen_width - 200, 10)))
+            else:
+                for row, player in enumerate(players.values()):
+                    dirty_rects.add(player.draw_label(screen, (screen_width - 320, 10 + row * font_size)))
 
 
 
 
     # Draw hand keypoints
-    draw_hand_keypoints(screen, [left_hand_keypoint, right_hand_keypoint])
+    draw_hand_keypoints(screen, hands)
+    if perf_hud.visible:
+        if entity_store is not None:
+            object_counts = entity_store.live_counts()
+        else:
+            object_counts = {"items": len(game_items), "halves": 2 * len(sliced_fruits)}
+        object_counts["splashes"] = len(active_splash_effects)
+        dirty_rects.add(perf_hud.draw(screen, object_counts))
+    profiler.lap("hud")
 
 
 
 
 
     # Update the screen
-    pygame.display.flip()
+    if dirty_renderer is not None:
+        dirty_renderer.end_frame()
+    else:
+        pygame.display.flip()
+    profiler.lap("display_flip")
+    if not first_frame_drawn:
+        startup.mark("first frame")
+        first_frame_drawn = True
 
     # Check for game over
     if lives <= 0:
         running = False
-        high_scores = load_high_scores()
-        high_scores.append(score)
-        high_scores.sort(reverse=True)
-        high_scores = high_scores[:5]  # Keep only the top 5 scores
-        save_high_scores(high_scores)
+        if person_tracker is None:
+            leaderboard.record(args.player_name, score, GameItem.difficulty_multiplier)
+        else:
+            for player in players.values():
+                leaderboard.record(f"Player {player.id}", player.score, GameItem.difficulty_multiplier)
         pygame.font.init()
-        display_high_scores(screen, high_scores, custom_font, color=(0, 0, 0))
+        display_high_scores(screen, leaderboard.top(), custom_font, color=(0, 0, 0))
         pygame.display.flip()
         pygame.time.wait(3000)
 
 
+    frame_count += 1
+    if args.max_frames is not None and frame_count >= args.max_frames:
+        running = False
+
     # Limit the frame rate
     clock.tick(FPS)
+    profiler.lap("idle")
+    if quality_governor is not None:
+        # Time spent working, not waiting in the frame-rate limiter
+        quality_governor.record(sum(profiler.current.values()) - profiler.current["idle"], inference_ms)
+        new_tier = quality_governor.update()
+        if new_tier is not None:
+            apply_quality_tier(new_tier)
+    profiler.end_frame()
 
 # Release resources
+print(f"Startup: {startup.summary()}")
+print(f"Frame profile: {profiler.summary()}")
+if dirty_renderer is not None:
+    print(f"Dirty rects: {dirty_renderer.stats()}")
+if args.profile_csv:
+    profiler.write_csv(args.profile_csv)
+if args.profile_trace:
+    profiler.write_chrome_trace(args.profile_trace)
+print(f"Asset cache: {assets.stats()}")
+print(f"Text cache: {text_cache.stats()}")
+print(f"Audio: {audio.stats()}")
+for pool_name, pool in (("game items", game_item_pool), ("sliced fruits", sliced_fruit_pool), ("splash effects", splash_effect_pool)):
+    print(f"Pool {pool_name}: {pool.stats()}")
+if pose_pipeline is not None:
+    pose_pipeline.stop()
+    if pose_pipeline.error is not None:
+        print(f"Pose pipeline stopped with an error: {pose_pipeline.error!r}")
+    print(f"Pose pipeline: {pose_pipeline.stats()} (bottleneck: {pose_pipeline.bottleneck()})")
+if roi_tracker is not None:
+    print(f"ROI tracker: {roi_tracker.stats()}")
+if motion_gate is not None:
+    print(f"Motion gate: {motion_gate.stats()}")
+print(f"Game clock: {game_clock.stats()}")
+if quality_governor is not None:
+    print(f"Quality governor: {quality_governor.stats()}")
+if args.inference_server and movenet_model is not None:
+    print(f"Inference server: {movenet_model.stats()}")
+if person_tracker is not None:
+    print(f"Person tracker: {person_tracker.stats()}")
+    for player in players.values():
+        print(f"Player {player.id}: score {player.score}, lives {player.lives}")
+if keypoint_recorder is not None:
+    keypoint_recorder.save()
+    print(f"Recorded {len(keypoint_recorder.keypoints)} keypoint frames to {keypoint_recorder.path}")
+leaderboard.close()
+print(f"Leaderboard: {leaderboard.stats()}")
+if cap.error is not None and cap is not pose_pipeline:
+    print(f"Capture process stopped with an error: {cap.error!r}")
 cap.release()
 pygame.mixer.music.stop()
 pygame.quit()
@@ -0,0 +1,192 @@
+import os
+
+import numpy as np
+
+# Local model files are looked up here unless --model-path is given
+MODELS_DIR = "models"
+
+
+class PoseBackend:
+    # Common interface for the MoveNet engines. A backend is loaded once, then
+    # called with a [1, size, size, 3] image and returns keypoints_with_scores
+    # as a float32 [1, 1, 17, 3] array of (y, x, score).
+    name = None
+    default_model_path = None
+    input_size = 256
+    input_dtype = np.int32
+    output_shape = (1, 1, 17, 3)
+    # Whether infer() accepts a batch of several images in one call
+    supports_batching = False
+
+    def __init__(self, model_path=None, num_threads=None):
+        self.model_path = model_path or self.default_model_path
+        self.num_threads = num_threads
+
+    def load(self):
+        raise NotImplementedError
+
+    def infer(self, input_image):
+        raise NotImplementedError
+
+    def __call__(self, input_image):
+        input_image = np.asarray(input_image)
+        if input_image.dtype != self.input_dtype:
+            input_image = input_image.astype(self.input_dtype)
+        outputs = self.infer(input_image)
+        return np.asarray(outputs, dtype=np.float32).reshape(self.output_shape)
+
+    def infer_batch(self, input_images):
+        # [B, size, size, 3] in, [B, ...] keypoints out. Models exported with
+        # a fixed batch size of 1 run the images one after another.
+        input_images = np.asarray(input_images)
+        if not self.supports_batching:
+            return np.concatenate([self(input_image[None]) for input_image in input_images])
+        if input_images.dtype != self.input_dtype:
+            input_images = input_images.astype(self.input_dtype)
+        outputs = self.infer(input_images)
+        return np.asarray(outputs, dtype=np.float32).reshape((len(input_images),) + self.output_shape[1:])
+
+
+class SavedModelBackend(PoseBackend):
+    # TensorFlow SavedModel signature, as published on TF Hub
+    hub_url = None
+
+    def load(self):
+        import tensorflow as tf
+
+        if os.path.isdir(self.model_path):
+            module = tf.saved_model.load(self.model_path)
+        elif self.hub_url is not None:
+            # No local copy: fall back to TF Hub, which needs network access the first time
+            import tensorflow_hub as hub
+            module = hub.load(self.hub_url)
+        else:
+            raise FileNotFoundError(f"SavedModel not found at {self.model_path}")
+        self.module = module
+        self.model = module.signatures['serving_default']
+        return self
+
+    def infer(self, input_image):
+        import tensorflow as tf
+
+        # SavedModel format expects tensor type of int32.
+        return self.model(tf.constant(input_image))['output_0'].numpy()
+
+
+class ThunderBackend(SavedModelBackend):
+    name = "thunder"
+    default_model_path = os.path.join(MODELS_DIR, "movenet_singlepose_thunder")
+    hub_url = "https://tfhub.dev/google/movenet/singlepose/thunder/4"
+    input_size = 256
+
+
+class LightningBackend(SavedModelBackend):
+    name = "lightning"
+    default_model_path = os.path.join(MODELS_DIR, "movenet_singlepose_lightning")
+    hub_url = "https://tfhub.dev/google/movenet/singlepose/lightning/4"
+    input_size = 192
+
+
+class MultiPoseBackend(SavedModelBackend):
+    # Up to 6 people per frame: [1, 6, 56] rows of 17 (y, x, score) keypoints
+    # followed by the person box (ymin, xmin, ymax, xmax, score)
+    name = "multipose"
+    default_model_path = os.path.join(MODELS_DIR, "movenet_multipose_lightning")
+    hub_url = "https://tfhub.dev/google/movenet/multipose/lightning/1"
+    input_size = 256
+    output_shape = (1, 6, 56)
+
+
+class TFLiteBackend(PoseBackend):
+    name = "tflite"
+    default_model_path = os.path.join(MODELS_DIR, "movenet_singlepose_lightning.tflite")
+    input_size = 192
+    input_dtype = np.uint8
+    supports_batching = True
+
+    def load(self):
+        if not os.path.isfile(self.model_path):
+            raise FileNotFoundError(f"TFLite model not found at {self.model_path}")
+        try:
+            # The standalone runtime is much lighter than full TensorFlow on kiosks
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+
+        self.interpreter = Interpreter(model_path=self.model_path, num_threads=self.num_threads)
+        self.interpreter.allocate_tensors()
+        input_details = self.interpreter.get_input_details()[0]
+        self.input_index = input_details['index']
+        self.input_size = int(input_details['shape'][1])
+        self.input_dtype = input_details['dtype']
+        self.output_index = self.interpreter.get_output_details()[0]['index']
+        self.batch_size = 1
+        return self
+
+    def set_batch_size(self, batch_size):
+        if batch_size == self.batch_size:
+            return
+        self.interpreter.resize_tensor_input(self.input_index, [batch_size, self.input_size, self.input_size, 3])
+        self.interpreter.allocate_tensors()
+        self.batch_size = batch_size
+
+    def infer_batch(self, input_images):
+        try:
+            return super().infer_batch(input_images)
+        except (RuntimeError, ValueError):
+            # Some exports cannot be resized past batch 1: go one at a time
+            self.set_batch_size(1)
+            self.supports_batching = False
+            return super().infer_batch(input_images)
+
+    def infer(self, input_image):
+        self.set_batch_size(len(input_image))
+        self.interpreter.set_tensor(self.input_index, input_image)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_index)
+
+
+class ONNXBackend(PoseBackend):
+    name = "onnx"
+    default_model_path = os.path.join(MODELS_DIR, "movenet_singlepose_lightning.onnx")
+    input_size = 192
+
+    onnx_dtypes = {
+        "tensor(int32)": np.int32,
+        "tensor(uint8)": np.uint8,
+        "tensor(float)": np.float32,
+    }
+
+    def load(self):
+        if not os.path.isfile(self.model_path):
+            raise FileNotFoundError(f"ONNX model not found at {self.model_path}")
+        try:
+            import onnxruntime
+        except ImportError as error:
+            raise ImportError("The onnx backend needs onnxruntime: pip install onnxruntime") from error
+
+        options = onnxruntime.SessionOptions()
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+        self.session = onnxruntime.InferenceSession(self.model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_dtype = self.onnx_dtypes.get(model_input.type, np.int32)
+        if isinstance(model_input.shape[1], int):
+            self.input_size = model_input.shape[1]
+        # A symbolic batch dimension means the whole batch goes in one run
+        self.supports_batching = not isinstance(model_input.shape[0], int)
+        return self
+
+    def infer(self, input_image):
+        return self.session.run(None, {self.input_name: input_image})[0]
+
+
+BACKENDS = {backend.name: backend for backend in (ThunderBackend, LightningBackend, MultiPoseBackend, TFLiteBackend, ONNXBackend)}
+
+
+def create_backend(name="thunder", model_path=None, num_threads=None):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown pose backend {name!r}, expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name](model_path, num_threads).load()
@@ -0,0 +1,126 @@
+import math
+
+import numpy as np
+
+
+def smoothing_factor(dt, cutoff):
+    # Exponential smoothing factor of a first-order low-pass filter
+    r = 2 * math.pi * cutoff * dt
+    return r / (r + 1)
+
+
+class OneEuroFilter:
+    # One Euro filter (Casiez et al.) on a 2D point: heavy smoothing while the
+    # wrist is still, less lag as it speeds up. Positions are extrapolated
+    # with the filtered velocity, capped at max_prediction seconds so a lost
+    # wrist does not fly off the screen.
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0, max_prediction=0.1):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.max_prediction = max_prediction
+        self.position = None
+        self.velocity = (0.0, 0.0)
+        self.timestamp = None
+
+    def reset(self):
+        # Forget the wrist; the next update starts from its position
+        self.position = None
+        self.velocity = (0.0, 0.0)
+        self.timestamp = None
+
+    def update(self, x, y, timestamp, confidence=1.0):
+        # Low-confidence detections move the estimate proportionally less
+        if self.position is None:
+            self.position = (float(x), float(y))
+            self.timestamp = timestamp
+            return self.position
+        dt = timestamp - self.timestamp
+        if dt <= 0:
+            return self.position
+        px, py = self.position
+        vx, vy = self.velocity
+        alpha_d = smoothing_factor(dt, self.d_cutoff)
+        vx += alpha_d * ((x - px) / dt - vx)
+        vy += alpha_d * ((y - py) / dt - vy)
+        cutoff = self.min_cutoff + self.beta * math.hypot(vx, vy)
+        alpha = smoothing_factor(dt, cutoff) * confidence
+        self.position = (px + alpha * (x - px), py + alpha * (y - py))
+        self.velocity = (vx, vy)
+        self.timestamp = timestamp
+        return self.position
+
+    def predict(self, timestamp):
+        if self.position is None:
+            return None
+        dt = min(max(timestamp - self.timestamp, 0.0), self.max_prediction)
+        return (self.position[0] + self.velocity[0] * dt, self.position[1] + self.velocity[1] * dt)
+
+
+class KalmanFilter:
+    # Constant-velocity Kalman filter on a 2D point, state (x, y, vx, vy).
+    # Updates are propagated to each measurement's own timestamp, so irregular
+    # inference intervals are handled, and the measurement noise is scaled
+    # by 1 / confidence.
+    def __init__(self, process_noise=5000.0, measurement_noise=25.0, max_prediction=0.1):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.max_prediction = max_prediction
+        self.state = None
+        self.covariance = None
+        self.timestamp = None
+
+    def reset(self):
+        self.state = None
+        self.covariance = None
+        self.timestamp = None
+
+    def propagate(self, dt):
+        transition = np.eye(4)
+        transition[0, 2] = transition[1, 3] = dt
+        # White-noise acceleration model
+        q = self.process_noise
+        noise = np.zeros((4, 4))
+        noise[0, 0] = noise[1, 1] = q * dt ** 3 / 3
+        noise[0, 2] = noise[2, 0] = noise[1, 3] = noise[3, 1] = q * dt ** 2 / 2
+        noise[2, 2] = noise[3, 3] = q * dt
+        self.state = transition @ self.state
+        self.covariance = transition @ self.covariance @ transition.T + noise
+
+    def update(self, x, y, timestamp, confidence=1.0):
+        if self.state is None:
+            self.state = np.array([x, y, 0.0, 0.0])
+            self.covariance = np.diag([self.measurement_noise, self.measurement_noise, 1e5, 1e5])
+            self.timestamp = timestamp
+            return (float(x), float(y))
+        dt = timestamp - self.timestamp
+        if dt < 0:
+            # Older than the last measurement: nothing to add
+            return self.predict(self.timestamp)
+        if dt > 0:
+            self.propagate(dt)
+        measurement_noise = self.measurement_noise / max(confidence, 0.05)
+        innovation_covariance = self.covariance[:2, :2] + np.eye(2) * measurement_noise
+        gain = self.covariance[:, :2] @ np.linalg.inv(innovation_covariance)
+        self.state = self.state + gain @ (np.array([x, y]) - self.state[:2])
+        self.covariance = self.covariance - gain @ self.covariance[:2, :]
+        self.timestamp = timestamp
+        return (float(self.state[0]), float(self.state[1]))
+
+    def predict(self, timestamp):
+        if self.state is None:
+            return None
+        dt = min(max(timestamp - self.timestamp, 0.0), self.max_prediction)
+        return (float(self.state[0] + self.state[2] * dt), float(self.state[1] + self.state[3] * dt))
+
+
+FILTERS = {"one-euro": OneEuroFilter, "kalman": KalmanFilter}
+
+
+def create_filter(name=None, **kwargs):
+    # None or "none" keeps HandKeyPoint's plain lerp towards each detection
+    if name in (None, "none"):
+        return None
+    if name not in FILTERS:
+        raise ValueError(f"Unknown wrist filter {name!r}, expected one of {sorted(FILTERS)}")
+    return FILTERS[name](**kwargs)
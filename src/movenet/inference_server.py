@@ -0,0 +1,298 @@
+import collections
+import json
+import os
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+from movenet.movenet_utils import run_batch_inference
+
+# Every message is a JSON header plus an optional raw array payload,
+# prefixed by their two lengths
+MESSAGE_PREFIX = struct.Struct("!II")
+
+
+def recv_exact(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError("inference socket closed")
+        received += count
+    return buffer
+
+
+def send_message(sock, header, array=None):
+    header_bytes = json.dumps(header).encode()
+    payload = b"" if array is None else memoryview(np.ascontiguousarray(array)).cast("B")
+    sock.sendall(MESSAGE_PREFIX.pack(len(header_bytes), len(payload)) + header_bytes)
+    if len(payload):
+        sock.sendall(payload)
+
+
+def recv_message(sock):
+    header_size, payload_size = MESSAGE_PREFIX.unpack(recv_exact(sock, MESSAGE_PREFIX.size))
+    header = json.loads(recv_exact(sock, header_size))
+    payload = recv_exact(sock, payload_size) if payload_size else None
+    return header, payload
+
+
+class PendingRequest:
+    __slots__ = ("connection", "request_id", "input_image", "received_at")
+
+    def __init__(self, connection, request_id, input_image, received_at):
+        self.connection = connection
+        self.request_id = request_id
+        self.input_image = input_image
+        self.received_at = received_at
+
+
+class ClientConnection:
+    # Replies come from the batch thread and from the client's own reader
+    # thread, so sends are serialized per connection
+    def __init__(self, sock):
+        self.sock = sock
+        self.lock = threading.Lock()
+
+    def send(self, header, array=None):
+        with self.lock:
+            send_message(self.sock, header, array)
+
+
+class InferenceServer:
+    # Shares one loaded pose model between the game processes of a
+    # multi-station box. Clients send preprocessed inputs over a Unix socket;
+    # pending inputs are grouped into micro-batches of up to max_batch, and a
+    # batch never waits more than max_wait_ms for its oldest input before it
+    # runs. Each batch is one run_batch_inference call.
+    def __init__(self, model, socket_path, max_batch=8, max_wait_ms=4.0, stats_interval=10.0):
+        self.model = model
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.stats_interval = stats_interval
+        self.pending = collections.deque()
+        self.condition = threading.Condition()
+        self.running = False
+        self.listener = None
+        # Connected clients, guarded by condition like pending
+        self.clients = 0
+
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.batch_sizes = collections.Counter()
+        self.queue_ms = collections.deque(maxlen=1000)
+        self.batch_ms = collections.deque(maxlen=1000)
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            # Left over from a previous run
+            os.unlink(self.socket_path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.socket_path)
+        self.listener.listen()
+        self.running = True
+        threading.Thread(target=self.batch_worker, name="inference-batches", daemon=True).start()
+        threading.Thread(target=self.stats_worker, name="inference-stats", daemon=True).start()
+        print(f"[server] {self.model.name} model serving on {self.socket_path} (batches of up to {self.max_batch}, {self.max_wait * 1000:.1f} ms deadline)")
+        try:
+            while self.running:
+                try:
+                    sock, _ = self.listener.accept()
+                except OSError:
+                    break
+                threading.Thread(target=self.client_worker, args=(ClientConnection(sock),), name="inference-client", daemon=True).start()
+        finally:
+            self.close()
+
+    def close(self):
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def client_worker(self, connection):
+        with self.condition:
+            self.clients += 1
+        try:
+            while self.running:
+                header, payload = recv_message(connection.sock)
+                kind = header.get("type")
+                if kind == "infer":
+                    input_image = np.frombuffer(payload, dtype=header["dtype"]).reshape(header["shape"])
+                    with self.condition:
+                        self.pending.append(PendingRequest(connection, header["id"], input_image, time.perf_counter()))
+                        self.condition.notify()
+                elif kind == "info":
+                    connection.send({
+                        "type": "info",
+                        "backend": self.model.name,
+                        "input_size": self.model.input_size,
+                        "input_dtype": np.dtype(self.model.input_dtype).name,
+                        "output_shape": list(self.model.output_shape),
+                    })
+                elif kind == "stats":
+                    connection.send({"type": "stats", "stats": self.stats()})
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            with self.condition:
+                self.clients -= 1
+                # A batch waiting for this client's frame can run now
+                self.condition.notify_all()
+            connection.sock.close()
+
+    def next_batch(self):
+        # Wait for the first request, then for more until the batch is full,
+        # every connected client has a frame queued (clients wait for each
+        # result) or the oldest one reaches its deadline. Only inputs with
+        # the same shape are batched together.
+        with self.condition:
+            while self.running and not self.pending:
+                self.condition.wait(0.1)
+            if not self.running:
+                return []
+            deadline = self.pending[0].received_at + self.max_wait
+            while self.running and len(self.pending) < min(self.max_batch, self.clients):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            shape = self.pending[0].input_image.shape
+            batch = []
+            for request in list(self.pending):
+                if len(batch) == self.max_batch:
+                    break
+                if request.input_image.shape == shape:
+                    batch.append(request)
+                    self.pending.remove(request)
+            return batch
+
+    def batch_worker(self):
+        while self.running:
+            batch = self.next_batch()
+            if not batch:
+                continue
+            try:
+                self.run_batch(batch)
+            except Exception as error:
+                if len(batch) == 1:
+                    self.fail_request(batch[0], error)
+                    continue
+                # Run the requests one at a time, so only the ones that fail
+                # on their own get an error
+                print(f"[server] batch of {len(batch)} failed, retrying its requests one at a time: {error!r}")
+                for request in batch:
+                    try:
+                        self.run_batch([request])
+                    except Exception as request_error:
+                        self.fail_request(request, request_error)
+
+    def fail_request(self, request, error):
+        self.errors += 1
+        print(f"[server] request {request.request_id} failed: {error!r}")
+        try:
+            request.connection.send({"type": "error", "id": request.request_id, "error": repr(error)})
+        except OSError:
+            pass
+
+    def run_batch(self, batch):
+        start = time.perf_counter()
+        input_images = np.concatenate([request.input_image for request in batch])
+        keypoints = run_batch_inference(self.model, input_images)
+        batch_ms = (time.perf_counter() - start) * 1000
+
+        self.requests += len(batch)
+        self.batches += 1
+        self.batch_sizes[len(batch)] += 1
+        self.batch_ms.append(batch_ms)
+        for request, keypoints_with_scores in zip(batch, keypoints):
+            queue_ms = (start - request.received_at) * 1000
+            self.queue_ms.append(queue_ms)
+            try:
+                request.connection.send({"type": "result", "id": request.request_id, "shape": list(self.model.output_shape), "queue_ms": round(queue_ms, 2), "batch_size": len(batch)}, keypoints_with_scores)
+            except OSError:
+                # Client went away while its frame was queued
+                pass
+
+    def stats_worker(self):
+        while self.running:
+            time.sleep(self.stats_interval)
+            if self.batches:
+                print(f"[server] {self.stats()}")
+
+    def stats(self):
+        def percentiles(samples):
+            if not samples:
+                return {"p50": 0.0, "p95": 0.0}
+            p50, p95 = np.percentile(np.fromiter(samples, dtype=np.float64), (50, 95))
+            return {"p50": round(float(p50), 2), "p95": round(float(p95), 2)}
+
+        with self.condition:
+            clients = self.clients
+            pending = len(self.pending)
+        return {
+            "clients": clients,
+            "requests": self.requests,
+            "batches": self.batches,
+            "errors": self.errors,
+            "average_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+            "queue_ms": percentiles(self.queue_ms),
+            "batch_ms": percentiles(self.batch_ms),
+            "pending": pending,
+        }
+
+
+class InferenceClient:
+    # Stands in for a PoseBackend inside a game process: calling it sends the
+    # preprocessed input to an InferenceServer and returns that input's
+    # keypoints. input_size and input_dtype come from the server's model.
+    name = "server"
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self.sock = None
+        self.lock = threading.Lock()
+        self.next_id = 0
+
+    def load(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+        info = self.request({"type": "info"})[0]
+        self.backend = info["backend"]
+        self.input_size = info["input_size"]
+        self.input_dtype = np.dtype(info["input_dtype"]).type
+        self.output_shape = tuple(info["output_shape"])
+        return self
+
+    def request(self, header, array=None):
+        with self.lock:
+            send_message(self.sock, header, array)
+            reply = recv_message(self.sock)
+        if reply[0].get("type") == "error":
+            raise RuntimeError(f"Inference server error: {reply[0]['error']}")
+        return reply
+
+    def __call__(self, input_image):
+        input_image = np.ascontiguousarray(input_image, dtype=self.input_dtype)
+        self.next_id += 1
+        header, payload = self.request({"type": "infer", "id": self.next_id, "shape": list(input_image.shape), "dtype": input_image.dtype.name}, input_image)
+        return np.frombuffer(payload, dtype=np.float32).reshape(header["shape"])
+
+    def stats(self):
+        return self.request({"type": "stats"})[0]["stats"]
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
@@ -0,0 +1,128 @@
+import time
+
+import cv2
+import numpy as np
+
+from movenet.movenet_utils import get_people
+
+# MoveNet keypoint indices of the wrists
+LEFT_WRIST = 9
+RIGHT_WRIST = 10
+
+
+class MotionGate:
+    # Decides per camera frame whether the pose model needs to run. The frame
+    # is shrunk to a small grayscale image and compared with the one from the
+    # last inference; if fewer than motion_threshold of its pixels changed by
+    # more than pixel_threshold, the previous keypoints are reused. Comparing
+    # against the last inferred frame (not the previous frame) means slow
+    # movement still adds up to a refresh, and min_refresh_hz forces one
+    # regardless.
+    #
+    # With wrist_roi the comparison is limited to boxes around the wrists of
+    # the last result (whole frame when none were seen). Keypoints are in
+    # mirrored frame coordinates unless mirrored is False.
+    def __init__(self, motion_threshold=0.01, pixel_threshold=12, min_refresh_hz=2.0, width=96, wrist_roi=False, roi_size=0.25, keypoint_threshold=0.15, mirrored=True):
+        self.motion_threshold = motion_threshold
+        self.pixel_threshold = pixel_threshold
+        self.refresh_interval = 1 / min_refresh_hz
+        self.width = width
+        self.wrist_roi = wrist_roi
+        self.roi_size = roi_size
+        self.keypoint_threshold = keypoint_threshold
+        self.mirrored = mirrored
+        self.reference = None
+        self.small = None
+        self.last_inference = None
+        # Wrist boxes (top, left, bottom, right) in small-image pixels
+        self.rois = []
+
+        self.frames = 0
+        self.skipped = 0
+        self.forced = 0
+        self.last_motion = 0.0
+        self.gate_ms = 0.0
+        self.inference_ms = 0.0
+        self.saved_ms = 0.0
+
+    def downsample(self, frame):
+        frame_height, frame_width = frame.shape[:2]
+        height = max(1, round(frame_height * self.width / frame_width))
+        if self.small is None or self.small.shape != (height, self.width):
+            self.small = np.empty((height, self.width), dtype=np.uint8)
+            self.reference = None
+        # Bilinear is a fraction of INTER_AREA's cost at these ratios; the blur
+        # on the small image evens out the sensor noise that sampling keeps
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self.small)
+        cv2.GaussianBlur(self.small, (3, 3), 0, dst=self.small)
+        return self.small
+
+    def motion(self, small):
+        # Fraction of the watched pixels that changed since the last inference
+        changed = cv2.absdiff(small, self.reference) > self.pixel_threshold
+        if not self.rois:
+            return float(np.count_nonzero(changed)) / changed.size
+        count = total = 0
+        for top, left, bottom, right in self.rois:
+            region = changed[top:bottom, left:right]
+            count += np.count_nonzero(region)
+            total += region.size
+        return count / total if total else 1.0
+
+    def should_infer(self, frame, timestamp=None):
+        start = time.perf_counter()
+        timestamp = start if timestamp is None else timestamp
+        self.frames += 1
+        small = self.downsample(frame)
+        if self.reference is None or timestamp - self.last_inference >= self.refresh_interval:
+            infer = True
+            if self.reference is not None:
+                self.forced += 1
+        else:
+            self.last_motion = self.motion(small)
+            infer = self.last_motion >= self.motion_threshold
+        if infer:
+            self.reference = small.copy()
+            self.last_inference = timestamp
+        else:
+            self.skipped += 1
+            self.saved_ms += self.inference_ms
+        self.gate_ms += ((time.perf_counter() - start) * 1000 - self.gate_ms) * 0.1
+        return infer
+
+    def record_inference(self, keypoints_with_scores, milliseconds):
+        # Called after each inference the gate let through: its cost (for the
+        # saved-time estimate) and its wrists (for the ROI)
+        self.inference_ms = milliseconds if self.inference_ms == 0 else self.inference_ms + (milliseconds - self.inference_ms) * 0.1
+        if self.wrist_roi and self.small is not None:
+            self.rois = self.wrist_boxes(keypoints_with_scores)
+
+    def wrist_boxes(self, keypoints_with_scores):
+        height, width = self.small.shape
+        half = self.roi_size * width / 2
+        boxes = []
+        for keypoints, _ in get_people(keypoints_with_scores, keypoint_threshold=self.keypoint_threshold):
+            for y, x, score in keypoints[[LEFT_WRIST, RIGHT_WRIST]]:
+                if score <= self.keypoint_threshold:
+                    continue
+                if self.mirrored:
+                    x = 1.0 - x
+                center_x, center_y = x * width, y * height
+                top, left = max(0, int(center_y - half)), max(0, int(center_x - half))
+                bottom, right = min(height, int(center_y + half) + 1), min(width, int(center_x + half) + 1)
+                if bottom > top and right > left:
+                    boxes.append((top, left, bottom, right))
+        return boxes
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "inferences": self.frames - self.skipped,
+            "skipped": self.skipped,
+            "skip_ratio": round(self.skipped / self.frames, 3) if self.frames else 0.0,
+            "forced_refreshes": self.forced,
+            "wrist_rois": len(self.rois),
+            "gate_ms": round(self.gate_ms, 3),
+            "saved_ms": round(self.saved_ms, 1),
+        }
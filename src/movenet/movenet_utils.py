@@ -1,36 +1,112 @@
-import cv2
+import threading
+import time
+
 import numpy as np
-import tensorflow as tf
-import tensorflow_hub as hub
+from movenet.backends import create_backend
+from movenet.preprocessing import FramePreprocessor
 
-# Load the MoveNet model
-module = hub.load("https://tfhub.dev/google/movenet/singlepose/thunder/4")
+# Default input size (Thunder); each backend reports its own
 input_size = 256
 
-def load_model():
-    return module.signatures['serving_default']
+def load_model(backend="thunder", model_path=None, num_threads=None):
+    # Load a pose backend (thunder, lightning, multipose, tflite or onnx) from a local model path
+    return create_backend(backend, model_path, num_threads)
 
-def preprocess_image(frame):
-    input_image = tf.image.resize_with_pad(np.expand_dims(frame, axis=0), input_size, input_size)
-    return input_image
+def preprocess_image(frame, input_size=input_size, dtype=np.int32):
+    # One-off letterboxed RGB model input. The game loop keeps a
+    # FramePreprocessor instead, which reuses its buffers between frames.
+    return FramePreprocessor(input_size, dtype, mirror=False, buffers=1).preprocess(frame)
 
 def run_inference(model, input_image):
-    # SavedModel format expects tensor type of int32.
-    input_image = tf.cast(input_image, dtype=tf.int32)
-    # Run model inference.
-    outputs = model(input_image)['output_0'].numpy()
+    # Run model inference. The backend casts the image to its input dtype.
+    outputs = model(input_image)
     # Output is a [1, 1, 17, 3] tensor.
     keypoints_with_scores = outputs
     return keypoints_with_scores
 
+def run_batch_inference(model, input_images):
+    # One model call for a [B, size, size, 3] batch, as used by the inference
+    # server; returns the keypoints of every image stacked along axis 0
+    return model.infer_batch(input_images)
+
+def warm_up(model):
+    # Run one inference on a blank frame so graph tracing and allocation
+    # happen before the first real frame
+    blank_frame = np.zeros((model.input_size, model.input_size, 3), dtype=np.uint8)
+    return run_inference(model, preprocess_image(blank_frame, model.input_size, model.input_dtype))
+
+class ModelLoader:
+    # Imports TensorFlow, loads the pose backend and warms it up on a
+    # background thread while the game window is already showing. With
+    # server_path it connects to a shared InferenceServer instead.
+    def __init__(self, backend="thunder", model_path=None, num_threads=None, server_path=None):
+        self.backend = backend
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self.server_path = server_path
+        self.model = None
+        self.error = None
+        self.timings = {}
+        self.loaded = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self.run, name="pose-model-loader", daemon=True).start()
+        return self
+
+    def run(self):
+        try:
+            start = time.perf_counter()
+            if self.server_path is not None:
+                from movenet.inference_server import InferenceClient
+                model = InferenceClient(self.server_path).load()
+            else:
+                model = load_model(self.backend, self.model_path, self.num_threads)
+            self.timings["model load"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            warm_up(model)
+            self.timings["model warm-up"] = time.perf_counter() - start
+            self.model = model
+        except Exception as error:
+            self.error = error
+        finally:
+            self.loaded.set()
+
+    def ready(self):
+        return self.loaded.is_set()
+
+def get_people(keypoints_with_scores, person_threshold=0.2, keypoint_threshold=0.15):
+    # Every detected person as (keypoints [17, 3], box (ymin, xmin, ymax, xmax)).
+    # MultiPose output carries its own boxes; for single-pose output the box
+    # is the extent of the confident keypoints.
+    keypoints_with_scores = np.asarray(keypoints_with_scores)
+    people = []
+    if keypoints_with_scores.shape[-1] == 56:
+        for detection in keypoints_with_scores[0]:
+            if detection[55] >= person_threshold:
+                people.append((detection[:51].reshape(17, 3), detection[51:55]))
+        return people
+
+    keypoints = keypoints_with_scores[0, 0]
+    confident = keypoints[keypoints[:, 2] > keypoint_threshold]
+    if len(confident):
+        box = np.array([confident[:, 0].min(), confident[:, 1].min(), confident[:, 0].max(), confident[:, 1].max()])
+        people.append((keypoints, box))
+    return people
+
 def get_hand_keypoints(keypoints_with_scores, keypoint_threshold=0.15):
+    if np.shape(keypoints_with_scores)[-1] == 56:
+        # MultiPose output: follow the most confident person
+        best = keypoints_with_scores[0, np.argmax(keypoints_with_scores[0, :, 55])]
+        keypoints_with_scores = best[:51].reshape(1, 1, 17, 3)
+    # Normalized (x, y, confidence) of each wrist seen above the threshold
     hand_keypoints = {}
     # Left wrist
     left_wrist = keypoints_with_scores[0, 0, 9, :]
     if left_wrist[2] > keypoint_threshold:
-        hand_keypoints['left_wrist'] = (left_wrist[1], left_wrist[0])
+        hand_keypoints['left_wrist'] = (left_wrist[1], left_wrist[0], left_wrist[2])
     # Right wrist
     right_wrist = keypoints_with_scores[0, 0, 10, :]
     if right_wrist[2] > keypoint_threshold:
-        hand_keypoints['right_wrist'] = (right_wrist[1], right_wrist[0])
+        hand_keypoints['right_wrist'] = (right_wrist[1], right_wrist[0], right_wrist[2])
     return hand_keypoints
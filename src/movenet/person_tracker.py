@@ -0,0 +1,113 @@
+import numpy as np
+
+
+class PersonTrack:
+    def __init__(self, track_id, keypoints, box):
+        self.id = track_id
+        self.keypoints = keypoints
+        self.box = box
+        self.misses = 0
+        self.hits = 1
+
+
+def box_iou(boxes_a, boxes_b):
+    # (A, B) intersection over union of (ymin, xmin, ymax, xmax) boxes
+    top = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    left = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    bottom = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    right = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    intersection = np.clip(bottom - top, 0, None) * np.clip(right - left, 0, None)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return intersection / np.maximum(union, 1e-6)
+
+
+def keypoint_distances(keypoints_a, keypoints_b, keypoint_threshold=0.2):
+    # (A, B) mean distance between the keypoints both poses are confident
+    # about, inf where they share none
+    confident = (keypoints_a[:, None, :, 2] > keypoint_threshold) & (keypoints_b[None, :, :, 2] > keypoint_threshold)
+    distances = np.linalg.norm(keypoints_a[:, None, :, :2] - keypoints_b[None, :, :, :2], axis=3)
+    counts = confident.sum(axis=2)
+    total = np.where(confident, distances, 0.0).sum(axis=2)
+    return np.where(counts > 0, total / np.maximum(counts, 1), np.inf)
+
+
+class PersonTracker:
+    # Gives every person in the MultiPose output a stable id across frames so
+    # each player keeps their blade, score and lives. Detections are matched
+    # greedily to the existing tracks by box IoU, falling back to the mean
+    # keypoint distance when boxes jump (arms thrown out, partial occlusion).
+    # A track survives max_misses frames without a match before it is dropped.
+    def __init__(self, max_people=6, iou_threshold=0.3, max_keypoint_distance=0.1, max_misses=15, keypoint_threshold=0.2):
+        self.max_people = max_people
+        self.iou_threshold = iou_threshold
+        self.max_keypoint_distance = max_keypoint_distance
+        self.max_misses = max_misses
+        self.keypoint_threshold = keypoint_threshold
+        self.tracks = []
+        self.dropped = []
+        self.next_id = 1
+        self.frames = 0
+        self.matches = 0
+
+    def update(self, people):
+        # people is a list of (keypoints [17, 3], box) as returned by
+        # get_people(). Returns the tracks seen in this frame; the ids of
+        # tracks that expired are left in self.dropped.
+        self.frames += 1
+        self.dropped = []
+        matched_tracks = set()
+        matched_people = set()
+        updated = []
+
+        if self.tracks and people:
+            iou = box_iou(np.array([track.box for track in self.tracks]), np.array([box for _, box in people]))
+            distance = keypoint_distances(np.array([track.keypoints for track in self.tracks]), np.array([keypoints for keypoints, _ in people]), self.keypoint_threshold)
+            similar = (iou >= self.iou_threshold) | (distance <= self.max_keypoint_distance)
+            # Overlap counts most; a close pose breaks ties and rescues low-IoU pairs
+            similarity = iou + np.clip(1.0 - distance / self.max_keypoint_distance, 0.0, 1.0)
+            pairs = np.argwhere(similar)
+            order = np.argsort(-similarity[similar], kind="stable")
+            for track_index, person_index in pairs[order].tolist():
+                if track_index in matched_tracks or person_index in matched_people:
+                    continue
+                matched_tracks.add(track_index)
+                matched_people.add(person_index)
+                track = self.tracks[track_index]
+                track.keypoints, track.box = people[person_index]
+                track.misses = 0
+                track.hits += 1
+                updated.append(track)
+            self.matches += len(matched_tracks)
+
+        kept = []
+        for track_index, track in enumerate(self.tracks):
+            if track_index not in matched_tracks:
+                track.misses += 1
+                if track.misses > self.max_misses:
+                    self.dropped.append(track.id)
+                    continue
+            kept.append(track)
+        self.tracks = kept
+
+        for person_index, (keypoints, box) in enumerate(people):
+            if person_index in matched_people or len(self.tracks) >= self.max_people:
+                continue
+            track = PersonTrack(self.next_id, keypoints, box)
+            self.next_id += 1
+            self.tracks.append(track)
+            updated.append(track)
+        return updated
+
+    def clear(self):
+        self.dropped = [track.id for track in self.tracks]
+        self.tracks = []
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "active": len(self.tracks),
+            "ids_issued": self.next_id - 1,
+            "matches": self.matches,
+        }
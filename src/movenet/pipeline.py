@@ -0,0 +1,195 @@
+import collections
+import threading
+import time
+
+import cv2
+
+
+class DropOldestQueue:
+    # Bounded hand-off queue between pipeline stages. When the consumer falls
+    # behind, the oldest item is discarded so consumers always see fresh frames.
+    def __init__(self, maxsize=1):
+        self.items = collections.deque(maxlen=maxsize)
+        self.condition = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item):
+        with self.condition:
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+            self.items.append(item)
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        with self.condition:
+            if not self.items and not self.closed:
+                self.condition.wait(timeout)
+            if not self.items:
+                return None
+            return self.items.popleft()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def __len__(self):
+        return len(self.items)
+
+
+class StageStats:
+    # Rolling latency and throughput counters for one pipeline stage
+    def __init__(self, name, smoothing=0.1):
+        self.name = name
+        self.smoothing = smoothing
+        self.count = 0
+        self.last_ms = 0.0
+        self.average_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds):
+        milliseconds = seconds * 1000
+        self.count += 1
+        self.last_ms = milliseconds
+        self.max_ms = max(self.max_ms, milliseconds)
+        if self.count == 1:
+            self.average_ms = milliseconds
+        else:
+            self.average_ms += (milliseconds - self.average_ms) * self.smoothing
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "last_ms": round(self.last_ms, 2),
+            "average_ms": round(self.average_ms, 2),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+class PosePipeline:
+    # Runs camera capture, preprocessing and inference on their own worker
+    # threads. The render loop calls latest() and never waits on the camera or
+    # the model. With a motion_gate, static frames skip preprocessing and
+    # inference and the previous keypoints are republished for them.
+    def __init__(self, capture, model, preprocess, inference, queue_size=1, mirror=True, motion_gate=None):
+        self.capture = capture
+        self.model = model
+        self.preprocess = preprocess
+        self.inference = inference
+        self.mirror = mirror
+        self.motion_gate = motion_gate
+
+        self.frame_queue = DropOldestQueue(queue_size)
+        self.input_queue = DropOldestQueue(queue_size)
+        self.stats_by_stage = {name: StageStats(name) for name in ("capture", "preprocess", "inference")}
+
+        self.lock = threading.Lock()
+        self.latest_result = None
+        self.latest_frame = None
+        self.running = False
+        self.finished = False
+        self.error = None
+        self.threads = []
+
+    def start(self):
+        self.running = True
+        for name, target in (("capture", self.capture_worker), ("preprocess", self.preprocess_worker), ("inference", self.inference_worker)):
+            thread = threading.Thread(target=self.run_stage, args=(target,), name=f"pose-{name}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        self.frame_queue.close()
+        self.input_queue.close()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+
+    def run_stage(self, target):
+        try:
+            target()
+        except Exception as error:
+            self.error = error
+            self.finished = True
+            self.frame_queue.close()
+            self.input_queue.close()
+
+    def capture_worker(self):
+        while self.running:
+            start = time.perf_counter()
+            ret, frame = self.capture.read()
+            if not ret:
+                # End of stream (or camera unplugged): let the game loop know
+                self.finished = True
+                self.frame_queue.close()
+                self.input_queue.close()
+                return
+            if self.motion_gate is not None and not self.motion_gate.should_infer(frame, start):
+                self.stats_by_stage["capture"].record(time.perf_counter() - start)
+                with self.lock:
+                    if self.latest_result is not None:
+                        self.latest_result = (self.latest_result[0], start)
+                continue
+            if self.mirror:
+                frame = cv2.flip(frame, 1)
+            self.stats_by_stage["capture"].record(time.perf_counter() - start)
+            with self.lock:
+                self.latest_frame = frame
+            self.frame_queue.put((start, frame))
+
+    def preprocess_worker(self):
+        while self.running:
+            item = self.frame_queue.get(timeout=0.1)
+            if item is None:
+                if self.frame_queue.closed:
+                    return
+                continue
+            captured_at, frame = item
+            start = time.perf_counter()
+            input_image = self.preprocess(frame)
+            self.stats_by_stage["preprocess"].record(time.perf_counter() - start)
+            self.input_queue.put((captured_at, input_image))
+
+    def inference_worker(self):
+        while self.running:
+            item = self.input_queue.get(timeout=0.1)
+            if item is None:
+                if self.input_queue.closed:
+                    return
+                continue
+            captured_at, input_image = item
+            start = time.perf_counter()
+            keypoints_with_scores = self.inference(self.model, input_image)
+            self.stats_by_stage["inference"].record(time.perf_counter() - start)
+            if self.motion_gate is not None:
+                self.motion_gate.record_inference(keypoints_with_scores, self.stats_by_stage["inference"].last_ms)
+            with self.lock:
+                # A static frame may have republished older keypoints under a
+                # newer timestamp while this one was in flight
+                if self.latest_result is None or captured_at > self.latest_result[1]:
+                    self.latest_result = (keypoints_with_scores, captured_at)
+
+    def latest(self):
+        # Most recent (keypoints_with_scores, capture timestamp), or None before
+        # the first inference completes
+        with self.lock:
+            return self.latest_result
+
+    def last_inference_ms(self):
+        return self.stats_by_stage["inference"].last_ms
+
+    def stats(self):
+        stats = {name: stage.as_dict() for name, stage in self.stats_by_stage.items()}
+        stats["frame_queue"] = {"depth": len(self.frame_queue), "dropped": self.frame_queue.dropped}
+        stats["input_queue"] = {"depth": len(self.input_queue), "dropped": self.input_queue.dropped}
+        latest = self.latest()
+        if latest is not None:
+            stats["keypoint_age_ms"] = round((time.perf_counter() - latest[1]) * 1000, 2)
+        return stats
+
+    def bottleneck(self):
+        # Stage with the highest average latency
+        return max(self.stats_by_stage.values(), key=lambda stage: stage.average_ms).name
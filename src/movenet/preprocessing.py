@@ -0,0 +1,77 @@
+import cv2
+import numpy as np
+
+
+class FramePreprocessor:
+    # Turns BGR camera frames into the model input without per-frame
+    # allocations: the frame is resized into a reused scratch image, then
+    # copied into a letterboxed [1, size, size, 3] buffer of the model's own
+    # dtype, with the BGR -> RGB swap and the cast done by that same copy.
+    #
+    # The frame is not flipped; run_inference() mirrors the keypoint x
+    # coordinates instead and undoes the letterbox, so keypoints come back
+    # normalized to the (mirrored) frame like RoiTracker's. Buffers are used
+    # round-robin so the pose pipeline can preprocess the next frame while
+    # the model still reads the previous one.
+    def __init__(self, input_size, dtype=np.int32, mirror=True, buffers=3):
+        self.input_size = input_size
+        self.dtype = dtype
+        self.mirror = mirror
+        self.buffers = [np.zeros((1, input_size, input_size, 3), dtype=dtype) for _ in range(buffers)]
+        self.next_buffer = 0
+        self.frame_shape = None
+        self.resized = None
+        # Letterboxed image inside the input: (top, left, height, width) in input pixels
+        self.box = None
+
+    def configure(self, frame_shape):
+        # Same letterbox as tf.image.resize_with_pad: scale the longer side
+        # to the input size and centre the image
+        frame_height, frame_width = frame_shape[:2]
+        scale = self.input_size / max(frame_height, frame_width)
+        height = max(1, round(frame_height * scale))
+        width = max(1, round(frame_width * scale))
+        self.box = ((self.input_size - height) // 2, (self.input_size - width) // 2, height, width)
+        self.resized = np.empty((height, width, 3), dtype=np.uint8)
+        for buffer in self.buffers:
+            buffer.fill(0)
+        self.frame_shape = (frame_height, frame_width)
+
+    def preprocess(self, frame):
+        if frame.shape[:2] != self.frame_shape:
+            self.configure(frame.shape)
+        top, left, height, width = self.box
+        cv2.resize(frame, (width, height), dst=self.resized, interpolation=cv2.INTER_LINEAR)
+        buffer = self.buffers[self.next_buffer]
+        self.next_buffer = (self.next_buffer + 1) % len(self.buffers)
+        np.copyto(buffer[0, top:top + height, left:left + width], self.resized[:, :, ::-1], casting="unsafe")
+        return buffer
+
+    def run_inference(self, model, input_image):
+        return self.to_frame(model(input_image))
+
+    def to_frame(self, keypoints_with_scores):
+        # Map input-normalized (y, x) back to frame-normalized coordinates,
+        # mirrored if the frame was not flipped. Handles single-pose
+        # [1, 1, 17, 3] and MultiPose [1, 6, 56] outputs (keypoints and boxes).
+        keypoints_with_scores = np.array(keypoints_with_scores, dtype=np.float32)
+        top, left, height, width = self.box
+        y_scale, y_offset = self.input_size / height, -top / height
+        x_scale, x_offset = self.input_size / width, -left / width
+        if self.mirror:
+            x_scale, x_offset = -x_scale, 1.0 - x_offset
+
+        if keypoints_with_scores.shape[-1] == 56:
+            coordinates = [(keypoints_with_scores[..., 0:51:3], keypoints_with_scores[..., 1:51:3]),
+                           (keypoints_with_scores[..., 51:55:2], keypoints_with_scores[..., 52:55:2])]
+        else:
+            coordinates = [(keypoints_with_scores[..., 0], keypoints_with_scores[..., 1])]
+        for ys, xs in coordinates:
+            ys *= y_scale
+            ys += y_offset
+            xs *= x_scale
+            xs += x_offset
+        if self.mirror and keypoints_with_scores.shape[-1] == 56:
+            # Mirroring swaps the box's left and right edges
+            keypoints_with_scores[..., [52, 54]] = keypoints_with_scores[..., [54, 52]]
+        return keypoints_with_scores
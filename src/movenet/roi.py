@@ -0,0 +1,103 @@
+import cv2
+import numpy as np
+
+# MoveNet keypoint indices used to centre the crop
+LEFT_HIP = 11
+RIGHT_HIP = 12
+
+
+class RoiTracker:
+    # Crops the camera frame to a padded square around the body found in the
+    # previous inference, so the player fills the model input instead of a few
+    # pixels of it. Falls back to the full (letterboxed) frame when too few
+    # keypoints are confident.
+    #
+    # Keypoints returned by run_inference are normalized to the full frame
+    # (y / frame height, x / frame width), whichever crop was used.
+    def __init__(self, keypoint_threshold=0.2, min_keypoints=6, padding=0.3, min_size=0.25):
+        self.keypoint_threshold = keypoint_threshold
+        self.min_keypoints = min_keypoints
+        self.padding = padding
+        self.min_size = min_size
+        # Square crop (top, left, side) in frame pixels, None means full frame
+        self.box = None
+        self.roi_frames = 0
+        self.full_frames = 0
+
+    def full_frame_box(self, frame_height, frame_width):
+        # Square centred on the frame: the same letterbox resize_with_pad uses
+        side = max(frame_height, frame_width)
+        return (frame_height - side) // 2, (frame_width - side) // 2, side
+
+    def preprocess(self, frame, input_size):
+        frame_height, frame_width = frame.shape[:2]
+        box = self.box
+        if box is None:
+            box = self.full_frame_box(frame_height, frame_width)
+            self.full_frames += 1
+        else:
+            self.roi_frames += 1
+
+        top, left, side = box
+        crop = np.zeros((side, side, 3), dtype=frame.dtype)
+        y0, x0 = max(top, 0), max(left, 0)
+        y1, x1 = min(top + side, frame_height), min(left + side, frame_width)
+        if y1 > y0 and x1 > x0:
+            crop[y0 - top:y1 - top, x0 - left:x1 - left] = frame[y0:y1, x0:x1]
+        input_image = cv2.resize(crop, (input_size, input_size), interpolation=cv2.INTER_LINEAR)
+        # MoveNet expects RGB; camera frames are BGR
+        cv2.cvtColor(input_image, cv2.COLOR_BGR2RGB, dst=input_image)
+        return np.expand_dims(input_image, axis=0), box, (frame_height, frame_width)
+
+    def run_inference(self, model, prepared):
+        input_image, box, frame_shape = prepared
+        keypoints_with_scores = np.array(model(input_image), dtype=np.float32)
+        keypoints_with_scores = self.to_frame(keypoints_with_scores, box, frame_shape)
+        self.update(keypoints_with_scores, frame_shape)
+        return keypoints_with_scores
+
+    def to_frame(self, keypoints_with_scores, box, frame_shape):
+        # Map crop-normalized keypoints back to full-frame normalized coordinates
+        top, left, side = box
+        frame_height, frame_width = frame_shape
+        keypoints_with_scores[..., 0] = (top + keypoints_with_scores[..., 0] * side) / frame_height
+        keypoints_with_scores[..., 1] = (left + keypoints_with_scores[..., 1] * side) / frame_width
+        return keypoints_with_scores
+
+    def update(self, keypoints_with_scores, frame_shape):
+        # Choose the crop for the next frame from this frame's keypoints
+        frame_height, frame_width = frame_shape
+        keypoints = keypoints_with_scores[0, 0]
+        confident = keypoints[:, 2] > self.keypoint_threshold
+        if confident.sum() < self.min_keypoints:
+            self.box = None
+            return
+
+        ys = keypoints[confident, 0] * frame_height
+        xs = keypoints[confident, 1] * frame_width
+        if confident[LEFT_HIP] and confident[RIGHT_HIP]:
+            center_y = (keypoints[LEFT_HIP, 0] + keypoints[RIGHT_HIP, 0]) / 2 * frame_height
+            center_x = (keypoints[LEFT_HIP, 1] + keypoints[RIGHT_HIP, 1]) / 2 * frame_width
+        else:
+            center_y = (ys.min() + ys.max()) / 2
+            center_x = (xs.min() + xs.max()) / 2
+
+        # Half the side covers the farthest confident keypoint plus padding,
+        # so raised wrists stay inside the crop
+        half_side = max(np.abs(ys - center_y).max(), np.abs(xs - center_x).max()) * (1 + self.padding)
+        half_side = max(half_side, self.min_size * max(frame_height, frame_width) / 2)
+        full_top, full_left, full_side = self.full_frame_box(frame_height, frame_width)
+        if half_side * 2 >= full_side:
+            self.box = None
+            return
+
+        side = int(half_side * 2)
+        self.box = (int(center_y - half_side), int(center_x - half_side), side)
+
+    def stats(self):
+        total = self.roi_frames + self.full_frames
+        return {
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "roi_ratio": round(self.roi_frames / total, 3) if total else 0.0,
+        }
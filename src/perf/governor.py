@@ -0,0 +1,97 @@
+import collections
+import time
+
+
+class QualityTier:
+    # One step of the quality ladder. backend swaps the pose model (only from
+    # thunder, the other engines have no lighter variant here), infer_every
+    # runs the model on every Nth camera frame with the wrist filter
+    # predicting in between, the caps bound splash and half particles, and
+    # dirty_rects switches presentation to the dirty-rect renderer.
+    def __init__(self, name, backend=None, infer_every=1, max_splashes=None, max_halves=None, dirty_rects=False):
+        self.name = name
+        self.backend = backend
+        self.infer_every = infer_every
+        self.max_splashes = max_splashes
+        self.max_halves = max_halves
+        self.dirty_rects = dirty_rects
+
+
+QUALITY_TIERS = [
+    QualityTier("high"),
+    QualityTier("medium", backend="lightning", max_splashes=24, max_halves=48),
+    QualityTier("low", backend="lightning", infer_every=2, max_splashes=12, max_halves=24, dirty_rects=True),
+    QualityTier("minimum", backend="lightning", infer_every=3, max_splashes=4, max_halves=8, dirty_rects=True),
+]
+
+
+class QualityGovernor:
+    # Watches how long frames and pose inferences take and steps through
+    # QUALITY_TIERS to hold target_fps. It steps down as soon as the average
+    # frame (excluding the frame-rate limiter's idle time) goes over budget,
+    # or when inference drops below min_pose_fps. It steps back up only after
+    # upgrade_cooldown seconds with plenty of headroom. An upgrade that has to
+    # be undone right away doubles that cooldown, so the tiers don't flap.
+    def __init__(self, target_fps=30, tiers=QUALITY_TIERS, min_pose_fps=15, window=90, upgrade_headroom=0.6, downgrade_cooldown=1.0, upgrade_cooldown=5.0, max_upgrade_cooldown=60.0):
+        self.target_fps = target_fps
+        self.tiers = tiers
+        self.frame_budget_ms = 1000 / target_fps
+        self.inference_budget_ms = 1000 / min_pose_fps
+        self.window = window
+        self.upgrade_headroom = upgrade_headroom
+        self.downgrade_cooldown = downgrade_cooldown
+        self.upgrade_cooldown = upgrade_cooldown
+        self.max_upgrade_cooldown = max_upgrade_cooldown
+        self.tier_index = 0
+        self.frame_ms = collections.deque(maxlen=window)
+        self.inference_ms = collections.deque(maxlen=window)
+        self.last_change = time.perf_counter()
+        self.last_direction = 0
+        self.changes = []
+
+    @property
+    def tier(self):
+        return self.tiers[self.tier_index]
+
+    def record(self, frame_ms, inference_ms=None):
+        self.frame_ms.append(frame_ms)
+        if inference_ms is not None:
+            self.inference_ms.append(inference_ms)
+
+    def update(self, now=None):
+        # Returns the new tier when it changed, otherwise None
+        now = time.perf_counter() if now is None else now
+        if len(self.frame_ms) < self.window // 2:
+            return None
+        frame_ms = sum(self.frame_ms) / len(self.frame_ms)
+        inference_ms = sum(self.inference_ms) / len(self.inference_ms) if self.inference_ms else 0.0
+        since_change = now - self.last_change
+
+        over_budget = frame_ms > self.frame_budget_ms or inference_ms > self.inference_budget_ms
+        headroom = frame_ms < self.frame_budget_ms * self.upgrade_headroom and inference_ms < self.inference_budget_ms * self.upgrade_headroom
+        if over_budget and self.tier_index < len(self.tiers) - 1 and since_change >= self.downgrade_cooldown:
+            if self.last_direction < 0 and since_change < 2 * self.upgrade_cooldown:
+                self.upgrade_cooldown = min(self.upgrade_cooldown * 2, self.max_upgrade_cooldown)
+            return self.step(1, now, frame_ms, inference_ms)
+        if headroom and self.tier_index > 0 and since_change >= self.upgrade_cooldown:
+            return self.step(-1, now, frame_ms, inference_ms)
+        return None
+
+    def step(self, direction, now, frame_ms, inference_ms):
+        old_tier = self.tier
+        self.tier_index += direction
+        print(f"[quality] {old_tier.name} -> {self.tier.name}: {frame_ms:.1f} ms/frame (budget {self.frame_budget_ms:.1f} ms), inference {inference_ms:.1f} ms")
+        self.changes.append((round(now, 3), old_tier.name, self.tier.name))
+        self.last_change = now
+        self.last_direction = direction
+        self.frame_ms.clear()
+        self.inference_ms.clear()
+        return self.tier
+
+    def stats(self):
+        return {
+            "tier": self.tier.name,
+            "target_fps": self.target_fps,
+            "changes": len(self.changes),
+            "upgrade_cooldown_s": self.upgrade_cooldown,
+        }
@@ -0,0 +1,50 @@
+import pygame
+
+from game_objects.text_cache import fonts
+
+
+class PerformanceHud:
+    # Toggleable overlay with FPS, per-stage p50/p95 milliseconds and live
+    # object counts. The text is re-rendered a few times per second, not every
+    # frame, so the overlay itself stays cheap.
+    def __init__(self, profiler, visible=False, font_size=20, refresh_ms=250, position=(10, 50)):
+        self.profiler = profiler
+        self.visible = visible
+        self.font = fonts.get(None, font_size)
+        self.refresh_ms = refresh_ms
+        self.position = position
+        self.panel = None
+        self.last_refresh = -refresh_ms
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def lines(self, counts):
+        lines = [f"FPS {self.profiler.fps():.1f}"]
+        p50, p95, p99 = self.profiler.percentiles("frame")
+        lines.append(f"frame  {p50:6.2f} / {p95:6.2f} / {p99:6.2f} ms")
+        for name in self.profiler.stage_names():
+            p50, p95, p99 = self.profiler.percentiles(name)
+            lines.append(f"{name:<14} {p50:6.2f} / {p95:6.2f} ms")
+        if counts:
+            lines.append("  ".join(f"{name} {count}" for name, count in counts.items()))
+        return lines
+
+    def rebuild(self, counts):
+        text_surfaces = [self.font.render(line, True, (255, 255, 255)) for line in self.lines(counts)]
+        width = max(surface.get_width() for surface in text_surfaces) + 12
+        line_height = self.font.get_linesize()
+        panel = pygame.Surface((width, line_height * len(text_surfaces) + 12), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 160))
+        for i, surface in enumerate(text_surfaces):
+            panel.blit(surface, (6, 6 + i * line_height))
+        self.panel = panel
+
+    def draw(self, screen, counts=None):
+        if not self.visible:
+            return None
+        now = pygame.time.get_ticks()
+        if self.panel is None or now - self.last_refresh >= self.refresh_ms:
+            self.rebuild(counts)
+            self.last_refresh = now
+        return screen.blit(self.panel, self.position)
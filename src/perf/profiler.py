@@ -0,0 +1,115 @@
+import collections
+import csv
+import json
+import time
+
+import numpy as np
+
+
+class StageTimer:
+    # Context manager for one named scope inside a frame
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, self.start, time.perf_counter())
+        return False
+
+
+class FrameProfiler:
+    # Per-frame stage timings with rolling percentiles. Stages are recorded
+    # either as scopes (with profiler.stage("render"): ...) or as laps
+    # (profiler.lap("capture") records the time since the previous lap).
+    def __init__(self, window=600, keep_frames=False, max_kept_frames=100000):
+        self.window = window
+        self.samples = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self.frame_times = collections.deque(maxlen=window)
+        self.keep_frames = keep_frames
+        self.max_kept_frames = max_kept_frames
+        self.frames = []
+        self.origin = time.perf_counter()
+        self.frame_index = 0
+        self.frame_start = None
+        self.last_lap = None
+        self.current = {}
+        self.events = []
+
+    def begin_frame(self):
+        self.frame_start = self.last_lap = time.perf_counter()
+        self.current = {}
+        self.events = []
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.add(name, self.last_lap, now)
+        self.last_lap = now
+
+    def stage(self, name):
+        return StageTimer(self, name)
+
+    def add(self, name, start, end):
+        milliseconds = (end - start) * 1000
+        self.current[name] = self.current.get(name, 0.0) + milliseconds
+        if self.keep_frames:
+            self.events.append((name, start, end))
+        if self.last_lap is not None and end > self.last_lap:
+            self.last_lap = end
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        end = time.perf_counter()
+        total_ms = (end - self.frame_start) * 1000
+        self.frame_times.append(total_ms)
+        for name, milliseconds in self.current.items():
+            self.samples[name].append(milliseconds)
+        if self.keep_frames and len(self.frames) < self.max_kept_frames:
+            self.frames.append((self.frame_index, self.frame_start, end, dict(self.current), self.events))
+        self.frame_index += 1
+        self.frame_start = None
+
+    def percentiles(self, name, quantiles=(50, 95, 99)):
+        samples = self.frame_times if name == "frame" else self.samples.get(name)
+        if not samples:
+            return tuple(0.0 for _ in quantiles)
+        return tuple(float(value) for value in np.percentile(np.fromiter(samples, dtype=np.float64), quantiles))
+
+    def fps(self):
+        if not self.frame_times:
+            return 0.0
+        return 1000 * len(self.frame_times) / sum(self.frame_times)
+
+    def stage_names(self):
+        return list(self.samples)
+
+    def summary(self):
+        summary = {"fps": round(self.fps(), 1)}
+        for name in ["frame"] + self.stage_names():
+            p50, p95, p99 = self.percentiles(name)
+            summary[name] = {"p50": round(p50, 2), "p95": round(p95, 2), "p99": round(p99, 2)}
+        return summary
+
+    def write_csv(self, path):
+        # One row per kept frame, one column per stage in milliseconds
+        stage_names = sorted({name for frame in self.frames for name in frame[3]})
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame", "start_ms", "total_ms"] + stage_names)
+            for frame_index, start, end, stages, events in self.frames:
+                row = [frame_index, round((start - self.origin) * 1000, 3), round((end - start) * 1000, 3)]
+                writer.writerow(row + [round(stages.get(name, 0.0), 3) for name in stage_names])
+
+    def write_chrome_trace(self, path):
+        # Chrome trace event format, viewable in chrome://tracing or Perfetto
+        trace_events = []
+        for frame_index, start, end, stages, events in self.frames:
+            trace_events.append({"name": "frame", "ph": "X", "pid": 1, "tid": 1, "ts": (start - self.origin) * 1e6, "dur": (end - start) * 1e6, "args": {"frame": frame_index}})
+            for name, event_start, event_end in events:
+                trace_events.append({"name": name, "ph": "X", "pid": 1, "tid": 1, "ts": (event_start - self.origin) * 1e6, "dur": (event_end - event_start) * 1e6})
+        with open(path, "w") as file:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, file)
@@ -0,0 +1,25 @@
+import time
+
+
+class StartupTimer:
+    # Times the startup phases (imports, camera, window, assets, model) so
+    # time-to-first-frame regressions show up in the console output
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        self.phases = []
+
+    def mark(self, phase):
+        # Record the time spent since the previous mark under this phase name
+        now = time.perf_counter()
+        self.add(phase, now - self.last, now)
+        self.last = now
+
+    def add(self, phase, seconds, now=None):
+        # Record a phase that was timed elsewhere, e.g. on a loader thread
+        now = time.perf_counter() if now is None else now
+        self.phases.append((phase, seconds))
+        print(f"[startup] {phase}: {seconds * 1000:.0f} ms (t+{(now - self.start) * 1000:.0f} ms)")
+
+    def summary(self):
+        return {phase: round(seconds * 1000, 1) for phase, seconds in self.phases}